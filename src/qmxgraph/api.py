@@ -5,11 +5,16 @@ from contextlib import nullcontext
 from typing import Any
 from typing import Generator
 from typing import List
+from typing import Sequence
+from typing import Tuple
 
 import qmxgraph.debug
 import qmxgraph.js
 from qmxgraph.exceptions import InvalidJavaScriptError
 
+# Name of JavaScript array holding results of calls in `QmxGraphApi.call_api_batch`.
+_BATCH_RESULTS = "batchResults"
+
 
 class QmxGraphApi(object):
     """
@@ -954,12 +959,58 @@ class QmxGraphApi(object):
         with self._call_context_manager_factory():
             self._call_api(fn, *args, sync=False)
 
+    def call_api_batch(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """
+        Call several functions in underlying API provided by JavaScript graph synchronously,
+        with a single evaluation of JavaScript, as every evaluation is a round trip to web
+        engine. Functions are called in the given order.
+
+        :param calls: Pairs of function call available in API and its positional arguments.
+            All object passed must be JSON encodable or Variable instances. Results of
+            previous calls in batch can be passed as arguments by using `batch_result`.
+        :return: Return of each API call, respectively.
+        """
+        calls = [(fn, tuple(args)) for fn, args in calls]
+        statements = "".join(
+            f" {_BATCH_RESULTS}.push(api.{qmxgraph.js.prepare_js_call(fn, *args)});"
+            for fn, args in calls
+        )
+        with self._call_context_manager_factory():
+            return self._eval_api_calls(
+                f"(function () {{ var {_BATCH_RESULTS} = [];{statements} "
+                f"return {_BATCH_RESULTS}; }})()",
+                [fn for fn, _ in calls],
+                sync=True,
+            )
+
+    @staticmethod
+    def batch_result(index: int) -> qmxgraph.js.Variable:
+        """
+        :param index: Index of a call in a batch given to `call_api_batch`.
+        :return: Reference to the result of that call, to be used as an argument of a
+            later call in the same batch.
+        """
+        return qmxgraph.js.Variable(f"{_BATCH_RESULTS}[{index}]")
+
     def _call_api(self, fn: str, *args, sync):
+        call = f"api.{qmxgraph.js.prepare_js_call(fn, *args)}"
+        return self._eval_api_calls(call, [fn], sync=sync)
+
+    def _eval_api_calls(self, call: str, fns: Sequence[str], *, sync):
         graph = self._graph()
         eval_func = graph.inner_web_view().eval_js if sync else graph.inner_web_view().eval_js_async
-        call = f"api.{qmxgraph.js.prepare_js_call(fn, *args)}"
 
         if qmxgraph.debug.is_qmxgraph_debug_enabled():
+            fn_checks = "".join(
+                f"""
+                if (!api.{fn}) {{
+                    throw Error(
+                        '[QmxGraph] unable to find function "{fn}"'
+                        + ' in javascript api'
+                    );
+                }}"""
+                for fn in fns
+            )
             call = textwrap.dedent(
                 f"""
                 if (
@@ -972,13 +1023,7 @@ class QmxGraphApi(object):
                 }}
                 if (typeof api === "undefined") {{
                     throw Error('[QmxGraph] `api` must be loaded');
-                }}
-                if (!api.{fn}) {{
-                    throw Error(
-                        '[QmxGraph] unable to find function "{fn}"'
-                        + ' in javascript api'
-                    );
-                }}
+                }}{fn_checks}
                 {call};
                 """
             )
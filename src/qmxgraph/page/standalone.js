@@ -28,6 +28,10 @@ graphs.runStandAlone = function runStandAlone(container, options, styles) {
         // Keeping it in window to help with debugging
         window.graphEditor = graphs.createGraph(container, options, styles);
         window.api = new graphs.Api(window.graphEditor);
+
+        // Allows anyone waiting for graph to be ready to use (like tests) to
+        // be notified instead of polling for it.
+        document.dispatchEvent(new Event("graph-ready"));
     }
 };
 
@@ -8,6 +8,8 @@ from typing import Tuple
 
 import attr
 from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QEventLoop
+from PyQt5.QtCore import QTimer
 from PyQt5.QtTest import QTest
 
 
@@ -26,7 +28,7 @@ def wait_signals_called(
             check_params_cb is None or check_params_cb(*callback.args)
         )
 
-    wait_until(success, timeout_ms=timeout_ms)
+    _wait_callback(callback, success, timeout_ms=timeout_ms)
 
 
 @contextmanager
@@ -34,15 +36,47 @@ def wait_callback_called(*, timeout_ms=1000) -> Generator["_Callback", None, Non
     """ """
     callback = _Callback()
     yield callback
-    wait_until(callback.was_called, timeout_ms=timeout_ms)
+    _wait_callback(callback, callback.was_called, timeout_ms=timeout_ms)
+
+
+def _wait_callback(
+    callback: "_Callback", predicate: Callable[[], bool], *, timeout_ms: int
+) -> None:
+    """
+    Runs a local event loop, quit by each call to callback, until predicate
+    holds. Waiting ends as soon as the call is dispatched instead of in the
+    next polling interval.
+    """
+    __tracebackhide__ = True
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(loop.quit)
+
+    # Predicate is only evaluated here, so errors raised by it aren't raised
+    # inside Qt signal handlers.
+    callback.on_called = loop.quit
+    timer.start(timeout_ms)
+    try:
+        while not predicate() and timer.isActive():
+            loop.exec_()
+    finally:
+        timer.stop()
+        callback.on_called = None
+
+    if not predicate():
+        raise TimeoutError("wait_until timed out in %s milliseconds" % timeout_ms)
 
 
 @attr.s(auto_attribs=True)
 class _Callback:
     args: Optional[Tuple[Any, ...]] = None
+    on_called: Optional[Callable[[], None]] = attr.ib(default=None, repr=False)
 
     def __call__(self, *args: Any) -> None:
         self.args = args
+        if self.on_called is not None:
+            self.on_called()
 
     def was_called(self) -> bool:
         return self.args is not None
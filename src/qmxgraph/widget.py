@@ -239,8 +239,7 @@ class QmxGraph(QWidget):
 
         self.show()
 
-        if not self.is_loaded():
-            self.load()
+        self.load()
         wait_until(
             self.is_loaded,
             timeout_ms=timeout_ms,
@@ -1,44 +1,124 @@
+import re
+
 import pytest
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.by import By
 
+# Start point of an edge in its SVG path, like "M 40 25 L 90 25".
+_EDGE_START_RE = re.compile(r"M (\d+) (\d+)")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--keep-page",
+        action="store_true",
+        default=False,
+        help="Graph cases reuse page left by previous case from same host, clearing its graph"
+        " instead of loading page again. Faster, but page state changed by tests (e.g. styles,"
+        " grid or outline toggles) is carried over to following tests.",
+    )
+
 
 def pytest_configure(config):
     # During warm up, clean up the temporary files/objects used by ports
     # fixture from previous runs. Note these files are shared among ALL slaves
-    # of pytest so they can't reliably be removed by a fixture.
-    config.cache.set("qmxgraph/ports", [])
+    # of pytest so they can't reliably be removed by a fixture, and neither by
+    # the slaves themselves: when running with pytest-xdist only the master
+    # process is allowed to clean up, otherwise a slave starting late could
+    # wipe ports (or the lock) already in use by other slaves.
+    if not _is_xdist_slave(config):
+        config.cache.set("qmxgraph/ports", [])
 
-    import os
+        import os
 
-    lock_file = _get_port_lock_filename(config.rootdir)
-    if os.path.isfile(lock_file):
-        os.remove(lock_file)
+        lock_file = _get_port_lock_filename(config.rootdir)
+        if os.path.isfile(lock_file):
+            os.remove(lock_file)
 
     import socket
 
     socket.setdefaulttimeout(15.0)
 
+    config._qmxgraph_driver = None
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Marks all tests which use the graph_cases fixture as "flaky".
+
+    Unfortunately we've been unable to properly fix some flaky failures with tests using this fixture (#4)*.
+
+    See pytest-rerunfailures plugin for more information.
+
+    Also starts in background the browser used by tests, if any collected
+    test uses it.
+    """
+    import os
+
+    if os.environ.get("CI", "false") == "true":
+        for item in items:
+            if "graph_cases" in getattr(item, "fixturenames", []):
+                item.add_marker(pytest.mark.flaky(reruns=3))
+
+    # Launching a browser takes a few seconds, so it is started in background
+    # as soon as tests are collected, but only when some of them use it. The
+    # master process of pytest-xdist doesn't run tests, so it doesn't need a
+    # browser.
+    if config.option.collectonly or not any(
+        "selenium" in getattr(item, "fixturenames", []) for item in items
+    ):
+        return
+    if _is_xdist_slave(config) or not getattr(config.option, "numprocesses", None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        port = Port(config.rootdir, config.cache)
+        config._qmxgraph_driver = executor.submit(_create_chrome_driver, port)
+        executor.shutdown(wait=False)
+
+
+def pytest_unconfigure(config):
+    # Browser launched in background may not have been used by any test.
+    driver_future = getattr(config, "_qmxgraph_driver", None)
+    if driver_future is not None and driver_future.exception() is None:
+        driver_future.result().quit()
+
 
 # Fixtures --------------------------------------------------------------------
 
 
-@pytest.fixture
-def chrome_options(chrome_options: ChromeOptions) -> ChromeOptions:
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    # Comment `--headless` and uncomment `--auto-open-devtools-for-tabs` to be
-    # able to debug the javascript from tests using selenium.
-    chrome_options.add_argument("--headless")
-    # chrome_options.add_argument("--auto-open-devtools-for-tabs")
-    return chrome_options
+@pytest.fixture(scope="session")
+def session_selenium(request, port):
+    """
+    A single Chrome WebDriver shared by all tests of a session (or of a
+    pytest-xdist slave), as spawning a new browser for every test is way
+    more expensive than the tests themselves. If available, the browser
+    launched in background after collection is used.
+
+    Graph state isn't carried between tests because every graph case
+    navigates to its host page again, which reloads a brand new graph.
+
+    :rtype: selenium.webdriver.remote.webdriver.WebDriver
+    """
+    driver_future = request.config._qmxgraph_driver
+    request.config._qmxgraph_driver = None
+    if driver_future is not None:
+        driver = driver_future.result()
+    else:
+        driver = _create_chrome_driver(port)
+    yield driver
+    driver.quit()
 
 
 @pytest.fixture
-def driver_kwargs(driver_kwargs, port):
-    driver_kwargs["service"].port = port.get()
-    return driver_kwargs
+def selenium(session_selenium):
+    """
+    Overrides pytest-selenium's fixture to reuse the session WebDriver
+    instead of launching a new browser for every test.
+
+    :rtype: selenium.webdriver.remote.webdriver.WebDriver
+    """
+    return session_selenium
 
 
 @pytest.fixture(autouse=True)
@@ -185,6 +265,35 @@ def host(port):
         yield host_
 
 
+@pytest.fixture(scope="session")
+def host_pool(port):
+    """
+    Hosts serving graph pages with custom options are expensive to start, so
+    tests requesting same options share a single host during session.
+
+    :type port: Port
+    :rtype: callable
+    :return: Function receiving a `qmxgraph.configuration.GraphOptions` and
+        returning a `qmxgraph.server.Host` serving a page with it.
+    """
+    from contextlib import ExitStack
+
+    from qmxgraph import server
+
+    hosts = {}
+    with ExitStack() as stack:
+
+        def get_host(options):
+            # Options may hold dicts (e.g. custom fonts), so they aren't
+            # always hashable, but their representation is.
+            key = repr(options)
+            if key not in hosts:
+                hosts[key] = stack.enter_context(server.host(port=port.get(), options=options))
+            return hosts[key]
+
+        yield get_host
+
+
 @pytest.fixture
 def wait_graph_page_ready(selenium):
     """
@@ -197,6 +306,32 @@ def wait_graph_page_ready(selenium):
     return functools.partial(_wait_graph_page_ready, selenium=selenium)
 
 
+@pytest.fixture(scope="session")
+def default_vertex_fill(session_selenium, host):
+    """
+    :type session_selenium: selenium.webdriver.remote.webdriver.WebDriver
+    :type host: qmxgraph.server.Host
+    :rtype: str
+    :return: Fill color of default vertex style in lower case, obtained once
+        per session as it never changes.
+    """
+    _wait_graph_page_ready(host=host, selenium=session_selenium)
+    return _get_style_color(session_selenium, "getDefaultVertexStyle", "STYLE_FILLCOLOR")
+
+
+@pytest.fixture
+def wait_css(selenium):
+    """
+    :type selenium: selenium.webdriver.remote.webdriver.WebDriver
+    :rtype: callable
+    :return: Wait until an element matching a CSS selector is present in
+        page, raise if timeout expires.
+    """
+    import functools
+
+    return functools.partial(_wait_css, selenium=selenium)
+
+
 @pytest.fixture
 def selenium_extras(selenium):
     """
@@ -216,51 +351,62 @@ class SeleniumExtras(object):
         :type e: _pytest._code.code.ExceptionInfo
         :rtype: str
         :return: Error messaged extracted from an `WebDriverException`,
-            raised when errors happen during tests using Selenium.
+            raised when errors happen during tests using Selenium. Only the
+            message of error raised by JavaScript is kept, without the prefix
+            and session details added by web driver.
         """
-        return e.value.msg
+        message = e.value.msg.splitlines()[0] if e.value.msg else ""
+        prefix = "javascript error: "
+        if message.startswith(prefix):
+            message = message[len(prefix) :]
+        return message
+
+
+@pytest.fixture(scope="session")
+def graph_case_templates():
+    """
+    Snapshots of cases already drawn during session, so the same case is
+    restored from its dump by later tests instead of being drawn again.
+
+    :rtype: dict[tuple[str, str], dict]
+    :return: Templates indexed by host address and case name.
+    """
+    return {}
 
 
 @pytest.fixture
-def graph_cases(selenium, host):
+def graph_cases(request, selenium, host, graph_case_templates):
     """
     Factory method that allows to draw preconfigured graphs and manipulate them
     with a series of helpful methods.
 
     :type selenium: selenium.webdriver.remote.webdriver.WebDriver
     :type host: qmxgraph.server.Host
+    :type graph_case_templates: dict[tuple[str, str], dict]
     :rtype: GraphCaseFactory
     :return: Factory able to create cases.
     """
-    return GraphCaseFactory(selenium=selenium, host=host)
+    return GraphCaseFactory(
+        selenium=selenium,
+        host=host,
+        templates=graph_case_templates,
+        keep_page=request.config.getoption("keep_page"),
+    )
 
 
 @pytest.fixture
-def graph_cases_factory(selenium):
+def graph_cases_factory(request, selenium, graph_case_templates):
     """
     :type selenium: selenium.webdriver.remote.webdriver.WebDriver
+    :type graph_case_templates: dict[tuple[str, str], dict]
     :rtype: callable
     :return: Constructor method to create a graph cases factory with a custom
         host.
     """
-    return lambda host: GraphCaseFactory(selenium=selenium, host=host)
-
-
-def pytest_collection_modifyitems(items):
-    """
-    Marks all tests which use the graph_cases fixture as "flaky".
-
-    Unfortunately we've been unable to properly fix some flaky failures with tests using this fixture (#4)*.
-
-    See pytest-rerunfailures plugin for more information.
-    """
-    import os
-
-    if os.environ.get("CI", "false") != "true":
-        return
-    for item in items:
-        if "graph_cases" in getattr(item, "fixturenames", []):
-            item.add_marker(pytest.mark.flaky(reruns=3))
+    keep_page = request.config.getoption("keep_page")
+    return lambda host: GraphCaseFactory(
+        selenium=selenium, host=host, templates=graph_case_templates, keep_page=keep_page
+    )
 
 
 class GraphCaseFactory(object):
@@ -269,9 +415,11 @@ class GraphCaseFactory(object):
     available.
     """
 
-    def __init__(self, selenium, host):
+    def __init__(self, selenium, host, templates, keep_page=False):
         self._selenium = selenium
         self._host = host
+        self._templates = templates
+        self._keep_page = keep_page
         self.case_map = {
             "empty": BaseGraphCase,
             "1v": Graph1Vertex,
@@ -294,36 +442,173 @@ class GraphCaseFactory(object):
         :return: Case with a graph already drawn.
         """
         case_type = self.case_map[case_name]
-        return case_type(selenium=self._selenium, host=self._host)
+        key = (self._host.address, case_name)
+        template = self._templates.get(key) if case_type.templatable else None
+
+        # A reused page doesn't need to have its graph cleared when it is going
+        # to be replaced by a template anyway.
+        if not (
+            self._keep_page
+            and _reset_graph_page(self._host, self._selenium, clear_graph=template is None)
+        ):
+            _wait_graph_page_ready(host=self._host, selenium=self._selenium)
+
+        case = case_type(selenium=self._selenium, host=self._host, template=template)
+        if template is None and case_type.templatable:
+            self._templates[key] = case.create_template()
+        return case
+
+
+# Callbacks available to tests registering handlers, each one appending
+# its arguments to a list in `window` (e.g. `window.__dblClick__`).
+_HANDLER_SINKS = (
+    "window.__sinks__ = {"
+    "    dblClick: function(cellId) {"
+    "        if (!window.__dblClick__) {"
+    "            window.__dblClick__ = [];"
+    "        }"
+    "        window.__dblClick__.push(cellId);"
+    "    },"
+    "    selectionChange: function(cellIds) {"
+    "        if (!window.__selectionChange__) {"
+    "            window.__selectionChange__ = [];"
+    "        }"
+    "        window.__selectionChange__.push(cellIds);"
+    "    },"
+    "    popupMenu: function(cellId, x, y) {"
+    "        if (!window.__popupMenu__) {"
+    "            window.__popupMenu__ = [];"
+    "        }"
+    "        window.__popupMenu__.push([cellId, x, y]);"
+    "    },"
+    "};"
+)
+
+
+# State of a freshly loaded page, after graph cases registered their handlers,
+# which is brought back when a page is reused by `_reset_graph_page`.
+_PAGE_STATE_SNAPSHOT = (
+    "var graph = graphEditor.graph;"
+    "window.__pageState__ = {"
+    "    listeners: [graph, graph.getModel(), graph.getView(), graph.getSelectionModel()].map("
+    "        function(source) {"
+    "            return [source, (source.eventListeners || []).slice()];"
+    "        }"
+    "    ),"
+    "    popupMenuFactory: graph.popupMenuHandler.factoryMethod,"
+    "};"
+)
 
 
 class BaseGraphCase(object):
-    def __init__(self, selenium, host):
+    # Cases built through user interactions (e.g. dragging with mouse) must
+    # always be built by them, as restoring them from a template would skip
+    # the very interactions tested.
+    templatable = True
+
+    def __init__(self, selenium, host, template=None):
+        """
+        :type selenium: selenium.webdriver.remote.webdriver.WebDriver
+        :type host: qmxgraph.server.Host
+        :param dict|None template: Snapshot of this same case created by
+            `create_template`. When given, graph is restored from it instead of
+            having its cells inserted one by one.
+        """
+        import json
+
         import qmxgraph.js
 
         self._selenium = selenium
         self._host = host
-        _wait_graph_page_ready(host=host, selenium=selenium)
-
-        selenium.execute_script(
-            "callback = function(cellIds) {"
+        self._template = template
+        # Finding elements is slow with web drivers, so lookups of graphical
+        # elements of cells are cached until graph is changed.
+        self._lookups = {}
+        self._style_colors = {}
+
+        # Every `execute_script` is a round trip to web driver, so event
+        # handlers are registered, sinks for handlers registered by tests are
+        # installed and all cells of case are drawn by a single script, which
+        # returns the ids of inserted cells. Handlers and sinks are set up
+        # only once by page, as a page may be reused by following cases.
+        script = [
+            "if (!window.__pageState__) {",
+            "api.registerCellsAddedHandler(function(cellIds) {"
             "    if (!window.__added__) {"
             "        window.__added__ = [];"
             "    }"
             "    window.__added__.push.apply(window.__added__, cellIds);"
-            "}"
-        )
-        self.eval_js_function("api.registerCellsAddedHandler", qmxgraph.js.Variable("callback"))
-
-        selenium.execute_script(
-            "callback = function(cellId, newLabel, oldLabel) {"
+            "});",
+            "api.registerLabelChangedHandler(function(cellId, newLabel, oldLabel) {"
             "    if (!window.__labels__) {"
             "        window.__labels__ = [];"
             "    }"
             "    window.__labels__.push({cellId: cellId, newLabel: newLabel, oldLabel: oldLabel});"  # noqa
-            "}"
+            "});",
+            _HANDLER_SINKS,
+            _PAGE_STATE_SNAPSHOT,
+            "}",
+            "var ids = {};",
+        ]
+        if template is None:
+            for name, fn, args in self.get_cells_to_insert():
+                call = qmxgraph.js.prepare_js_call(fn, *args)
+                script.append(f"ids.{name} = {call};" if name is not None else f"{call};")
+        else:
+            # Restoring a dump doesn't trigger cells added handlers, so cells
+            # reported when template was drawn are reported again.
+            script.append(qmxgraph.js.prepare_js_call("api.restore", template["dump"]) + ";")
+            if template["added"] is not None:
+                script.append("window.__added__ = {};".format(json.dumps(template["added"])))
+            script.append("ids = {};".format(json.dumps(template["ids"])))
+        script.append("return ids;")
+
+        for name, cell_id in selenium.execute_script("\n".join(script)).items():
+            setattr(self, name, cell_id)
+
+    def create_template(self):
+        """
+        Takes a snapshot of graph as drawn by this case, to be used by later
+        cases of same type instead of drawing everything again.
+
+        :rtype: dict
+        :return: Dump of graph, ids of inserted cells and cells reported as
+            added to graph.
+        """
+        dump, added = self.selenium.execute_script("return [api.dump(), window.__added__];")
+        ids = {
+            name: getattr(self, name)
+            for name, _fn, _args in self.get_cells_to_insert()
+            if name is not None
+        }
+        return {"dump": dump, "added": added, "ids": ids}
+
+    def get_cells_to_insert(self):
+        """
+        Cells drawn when case is created, all of them inserted by a single
+        script. Subclasses extend the calls of their base classes.
+
+        :rtype: list[tuple[str|None, str, tuple]]
+        :return: Calls inserting cells, each one composed by name of case
+            attribute which will store id of inserted cell (or None if it
+            shouldn't be stored), API function and its arguments. Ids of cells
+            inserted by previous calls can be used as arguments by means of
+            `cell_ref`.
+        """
+        return []
+
+    def count_elements(self, css_selector):
+        """
+        Counts elements in page without fetching them, as every element
+        returned to Python is a reference that must be resolved by web driver.
+
+        :param str css_selector: Selector matching elements counted.
+        :rtype: int
+        :return: Number of elements matching selector.
+        """
+        return self.selenium.execute_script(
+            "return document.querySelectorAll(arguments[0]).length", css_selector
         )
-        self.eval_js_function("api.registerLabelChangedHandler", qmxgraph.js.Variable("callback"))
 
     def get_container(self):
         """
@@ -338,8 +623,32 @@ class BaseGraphCase(object):
         :return: Width and height in pixels of graph drawing widget container
             element, respectively.
         """
-        container = self.get_container()
-        return container.size["width"], container.size["height"]
+        # Unlike `size`, `rect` obtains both dimensions in one round trip.
+        rect = self.get_container().rect
+        return int(rect["width"]), int(rect["height"])
+
+    def get_vertex_rect(self, vertex):
+        """
+        Obtains all attributes describing a vertex rectangle at once, as
+        every attribute obtained from an element is a round trip to web
+        driver.
+
+        :param selenium.webdriver.remote.webelement.WebElement vertex:
+            Graphical representation of vertex (or any other SVG element with
+            a position and a size, like decorations).
+        :rtype: tuple[float, float, float, float]
+        :return: Left/X and top/Y screen coordinates, width and height in
+            pixels of vertex, respectively.
+        """
+        return tuple(
+            self.selenium.execute_script(
+                "var e = arguments[0];"
+                "return ['x', 'y', 'width', 'height'].map(function(attr) {"
+                "    return parseFloat(e.getAttribute(attr));"
+                "});",
+                vertex,
+            )
+        )
 
     def get_vertex_position(self, vertex):
         """
@@ -348,7 +657,8 @@ class BaseGraphCase(object):
         :rtype: tuple[float, float]
         :return: Left/X and top/Y screen coordinates of vertex, respectively.
         """
-        return float(vertex.get_attribute("x")), float(vertex.get_attribute("y"))
+        x, y, _, _ = self.get_vertex_rect(vertex)
+        return float(x), float(y)
 
     def get_vertex_size(self, vertex):
         """
@@ -357,7 +667,8 @@ class BaseGraphCase(object):
         :rtype: tuple[int, int]
         :return: Width and height in pixels of vertex, respectively.
         """
-        return int(vertex.get_attribute("width")), int(vertex.get_attribute("height"))
+        _, _, width, height = self.get_vertex_rect(vertex)
+        return int(width), int(height)
 
     def get_edge(self, source, target):
         """
@@ -369,7 +680,9 @@ class BaseGraphCase(object):
         :return: Graphical element representing edge between vertices,
             if found, otherwise None.
         """
+        return self._lookup(("edge", source, target), lambda: self._find_edge(source, target))
 
+    def _find_edge(self, source, target):
         # An edge is represented by a SVG path, it is created from
         # right side of 'foo' vertex until it connects with 'bar'.
         def get(v, attr):
@@ -388,11 +701,7 @@ class BaseGraphCase(object):
             # If any of vertices is not longer in page, edge is also removed
             return None
 
-        color = self.selenium.execute_script(
-            "return graphEditor.graph.getStylesheet().getDefaultEdgeStyle()[mxConstants.STYLE_STROKECOLOR]"  # noqa
-        )
-        color = color.lower()
-
+        color = self._get_style_color("getDefaultEdgeStyle", "STYLE_STROKECOLOR")
         edge = self.selenium.find_elements(
             By.CSS_SELECTOR, f'path[stroke="{color}"][d~="M"][d~="{h_right}"][d~="{v_center}"]'
         )
@@ -428,9 +737,7 @@ class BaseGraphCase(object):
         :return: X and Y screen coordinates of start of path of edge,
             respectively.
         """
-        import re
-
-        edge_coords = re.search(r"M (\d+) (\d+)", edge.get_attribute("d"))
+        edge_coords = _EDGE_START_RE.search(edge.get_attribute("d"))
         return int(edge_coords.group(1)), int(edge_coords.group(2))
 
     def get_id(self, cell):
@@ -451,11 +758,35 @@ class BaseGraphCase(object):
         # so far.
         tolerance = self.selenium.execute_script("return graphEditor.graph.tolerance") / 2.0
 
+        rect = cell.rect
         id_ = self.eval_js_function(
-            "api.getCellIdAt", cell.location["x"] + tolerance, cell.location["y"] + tolerance
+            "api.getCellIdAt", round(rect["x"]) + tolerance, round(rect["y"]) + tolerance
         )
         return id_
 
+    def get_ids(self, *cells):
+        """
+        Obtains ids of several cells at once, as obtaining id of each cell by
+        `get_id` is a few round trips to web driver.
+
+        :param selenium.webdriver.remote.webelement.WebElement cells:
+            Graphical representation of edges or nodes.
+        :rtype: list[str|None]
+        :return: Id of each cell, respectively.
+        """
+        # Same position used by `get_id`, see it for details about tolerance.
+        return self.selenium.execute_script(
+            "var tolerance = graphEditor.graph.tolerance / 2.0;"
+            "return Array.prototype.map.call(arguments, function(cell) {"
+            "    var rect = cell.getBoundingClientRect();"
+            "    return api.getCellIdAt("
+            "        Math.round(rect.left + window.pageXOffset) + tolerance,"
+            "        Math.round(rect.top + window.pageYOffset) + tolerance"
+            "    );"
+            "});",
+            *cells,
+        )
+
     def get_type_at(self, x, y):
         """
         :param int x: X in screen coordinates.
@@ -484,6 +815,33 @@ class BaseGraphCase(object):
         """
         return self.eval_js_function("api.getLabel", self._as_cell_id(cell))
 
+    def get_cells_info(self, *cells):
+        """
+        Obtains information of several cells at once, which is way faster
+        than querying each information of each cell separately, as every
+        query is a round trip to web driver.
+
+        :param selenium.webdriver.remote.webelement.WebElement|str cells:
+            Graphical elements of cells or their ids.
+        :rtype: dict[str, dict]
+        :return: Information of each cell by its id, as a dict with keys
+            "type", "label", "visible" and "geometry" (see `getCellType`,
+            `getLabel`, `isVisible` and `getGeometry` in API, respectively).
+        """
+        return self.selenium.execute_script(
+            "var info = {};"
+            "arguments[0].forEach(function(cellId) {"
+            "    info[cellId] = {"
+            "        type: api.getCellType(cellId),"
+            "        label: api.getLabel(cellId),"
+            "        visible: api.isVisible(cellId),"
+            "        geometry: api.getGeometry(cellId),"
+            "    };"
+            "});"
+            "return info;",
+            [self._as_cell_id(cell) for cell in cells],
+        )
+
     def set_visible(self, cell, visible):
         """
         :param selenium.webdriver.remote.webelement.WebElement|str cell:
@@ -532,8 +890,9 @@ class BaseGraphCase(object):
         # because of element mismatch. This is an attempt to click in the
         # bottom right part of vertex that *usually* doesn't seem to have
         # anything over it.
-        x_offset = int(vertex.get_attribute("width")) // 2
-        y_offset = int(vertex.get_attribute("height")) // 2
+        width, height = self.get_vertex_size(vertex)
+        x_offset = width // 2
+        y_offset = height // 2
         assert (x_offset > 0) and (y_offset > 0)
         actions.move_to_element_with_offset(vertex, x_offset, y_offset)
         actions.click()
@@ -626,6 +985,7 @@ class BaseGraphCase(object):
         actions = ActionChains(self.selenium)
         actions.drag_and_drop(source, target)
         actions.perform()
+        self.invalidate()
 
     def insert_edge(self, source, target, label="", style=None, tags=None):
         """
@@ -650,10 +1010,10 @@ class BaseGraphCase(object):
         :return: All vertices found in graph. Be aware it assumes vertices
             only in default style.
         """
-        color = self.selenium.execute_script(
-            "return graphEditor.graph.getStylesheet().getDefaultVertexStyle()[mxConstants.STYLE_FILLCOLOR]"  # noqa
-        )
-        color = color.lower()
+        return self._lookup("vertices", self._find_vertices)
+
+    def _find_vertices(self):
+        color = self._get_style_color("getDefaultVertexStyle", "STYLE_FILLCOLOR")
         vertices = self.selenium.find_elements(By.CSS_SELECTOR, f'g>g>rect[fill="{color}"]')
         return vertices
 
@@ -672,12 +1032,112 @@ class BaseGraphCase(object):
         """
         import qmxgraph.js
 
+        if not fn.startswith(("api.get", "api.is", "api.has")):
+            # Any API function other than queries may change the graph.
+            self.invalidate()
+
         # Unlike Qt JS evaluation, Selenium doesn't include return by default,
         # it is necessary to include it in statement.
         return self.selenium.execute_script(
             "return {}".format(qmxgraph.js.prepare_js_call(fn, *args))
         )
 
+    def eval_js_batch(self, fn, args_list):
+        """
+        Evaluates a function several times with a single script, avoiding a
+        round trip to web driver for each call.
+
+        :param str fn: A function expression in JavaScript.
+        :param iterable[tuple] args_list: Positional arguments passed to
+            JavaScript function in each call.
+        :rtype: list[object]
+        :return: Return obtained by evaluation of each call, respectively.
+        """
+        import qmxgraph.js
+
+        if not fn.startswith(("api.get", "api.is", "api.has")):
+            # Any API function other than queries may change the graph.
+            self.invalidate()
+
+        calls = [qmxgraph.js.prepare_js_call(fn, *args) for args in args_list]
+        return self.selenium.execute_script("return [{}];".format(", ".join(calls)))
+
+    def collect_js_errors(self, calls):
+        """
+        Evaluates functions expected to fail with a single script, collecting
+        their errors instead of having an exception raised by web driver for
+        each one of them.
+
+        :param iterable[tuple[str, tuple]] calls: Function expressions in
+            JavaScript and their positional arguments.
+        :rtype: list[str|None]
+        :return: Error message of each call, respectively, or None if call
+            didn't fail.
+        """
+        import qmxgraph.js
+
+        calls = list(calls)
+        if not all(fn.startswith(("api.get", "api.is", "api.has")) for fn, _ in calls):
+            # Any API function other than queries may change the graph.
+            self.invalidate()
+
+        script = ["var errors = [];"]
+        for fn, args in calls:
+            script.append(
+                "try {{ {}; errors.push(null); }} catch (e) {{ errors.push(e.message); }}".format(
+                    qmxgraph.js.prepare_js_call(fn, *args)
+                )
+            )
+        script.append("return errors;")
+        return self.selenium.execute_script("\n".join(script))
+
+    def invalidate(self):
+        """
+        Discards cached lookups of graphical elements. Changes done by
+        methods of case already take care of this, it only must be called
+        after changes done directly to page (like user interactions or
+        scripts executed by web driver).
+        """
+        self._lookups.clear()
+
+    def _get_style_color(self, default_style, color_key):
+        """
+        :param str default_style: Name of stylesheet method returning a
+            default style.
+        :param str color_key: Name of mxGraph constant of a color key.
+        :rtype: str
+        :return: Color in lower case, cached as default styles never change.
+        """
+        key = (default_style, color_key)
+        if key not in self._style_colors:
+            self._style_colors[key] = _get_style_color(self.selenium, default_style, color_key)
+        return self._style_colors[key]
+
+    def _lookup(self, key, find):
+        """
+        :param object key: Identifies the lookup.
+        :param callable find: Finds graphical element(s) when not cached.
+        :return: Graphical element(s) found.
+        """
+        try:
+            return self._lookups[key]
+        except KeyError:
+            found = self._lookups[key] = find()
+            return found
+
+    @staticmethod
+    def cell_ref(name):
+        """
+        :param str name: Name of attribute storing id of a cell inserted by
+            `get_cells_to_insert`.
+        :rtype: qmxgraph.js.Variable
+        :return: Reference to id of cell, usable as argument of other calls
+            executed by same script.
+        """
+        import qmxgraph.js
+
+        return qmxgraph.js.Variable(f"ids.{name}")
+
     def _as_cell_id(self, cell):
         """
         :param selenium.webdriver.remote.webelement.WebElement|str cell:
@@ -705,24 +1165,21 @@ class BaseGraphCase(object):
 
 
 class Graph1Vertex(BaseGraphCase):
-    def __init__(self, selenium, host):
-        BaseGraphCase.__init__(self, selenium, host)
-
-        # Insert without style results in a rectangle in SVG drawn by mxGraph
-        selenium.execute_script("api.insertVertex(10, 10, 25, 25, 'label', null)")
+    def __init__(self, selenium, host, template=None):
+        BaseGraphCase.__init__(self, selenium, host, template)
 
         vertex = self.get_vertex()
-        assert vertex.get_attribute("x") == "10"
-        assert vertex.get_attribute("y") == "10"
-        assert vertex.get_attribute("width") == "25"
-        assert vertex.get_attribute("height") == "25"
+        assert self.get_vertex_rect(vertex) == (10, 10, 25, 25)
         assert self.get_label_element(vertex).text == "label"
 
+    def get_cells_to_insert(self):
+        # Insert without style results in a rectangle in SVG drawn by mxGraph
+        return BaseGraphCase.get_cells_to_insert(self) + [
+            ("vertex_id", "api.insertVertex", (10, 10, 25, 25, "label", None)),
+        ]
+
     def get_vertex(self):
-        color = self.selenium.execute_script(
-            "return graphEditor.graph.getStylesheet().getDefaultVertexStyle()[mxConstants.STYLE_FILLCOLOR]"  # noqa
-        )
-        color = color.lower()
+        color = self._get_style_color("getDefaultVertexStyle", "STYLE_FILLCOLOR")
 
         # The vertex basically is composed of two parts:
         # * A <rect> tag drawn in SVG (which is a grandchild of two consecutive
@@ -735,16 +1192,26 @@ class Graph1Vertex(BaseGraphCase):
 
 
 class Graph1Vertex1Port(Graph1Vertex):
-    def __init__(self, selenium, host):
-        Graph1Vertex.__init__(self, selenium, host)
-        vertex_id = self.get_id(self.get_vertex())
-        self.port_color = "#987654"
-        selenium.execute_script(
-            f"api.insertPort("
-            f"  {vertex_id}, 'foo',"
-            f"  0, 0, 5, 5,"
-            f"  '', 'shape=ellipse;fillColor={self.port_color}', null)"
-        )
+    port_color = "#987654"
+
+    def get_cells_to_insert(self):
+        return Graph1Vertex.get_cells_to_insert(self) + [
+            (
+                None,
+                "api.insertPort",
+                (
+                    self.cell_ref("vertex_id"),
+                    "foo",
+                    0,
+                    0,
+                    5,
+                    5,
+                    "",
+                    f"shape=ellipse;fillColor={self.port_color}",
+                    None,
+                ),
+            ),
+        ]
 
     def get_port(self):
         port_elements = self.selenium.find_elements(
@@ -755,19 +1222,18 @@ class Graph1Vertex1Port(Graph1Vertex):
 
 
 class Graph1VertexWithStyle(BaseGraphCase):
-    def __init__(self, selenium, host):
-        BaseGraphCase.__init__(self, selenium, host)
-
-        # Insert without style results in a rectangle in SVG drawn by mxGraph
-        selenium.execute_script("api.insertVertex(10, 10, 25, 25, 'yellow', 'yellow')")
+    def __init__(self, selenium, host, template=None):
+        BaseGraphCase.__init__(self, selenium, host, template)
 
         vertex = self.get_vertex()
-        assert vertex.get_attribute("x") == "10"
-        assert vertex.get_attribute("y") == "10"
-        assert vertex.get_attribute("width") == "25"
-        assert vertex.get_attribute("height") == "25"
+        assert self.get_vertex_rect(vertex) == (10, 10, 25, 25)
         assert self.get_label_element(vertex).text == "yellow"
 
+    def get_cells_to_insert(self):
+        return BaseGraphCase.get_cells_to_insert(self) + [
+            ("vertex_id", "api.insertVertex", (10, 10, 25, 25, "yellow", "yellow")),
+        ]
+
     def get_vertex(self):
         color = self.host.styles["yellow"]["fill_color"]
 
@@ -782,78 +1248,109 @@ class Graph1VertexWithStyle(BaseGraphCase):
 
 
 class Graph2Vertices(BaseGraphCase):
-    def __init__(self, selenium, host):
-        BaseGraphCase.__init__(self, selenium, host)
-
-        self.vertex1_id = self.insert_vertex(10, 10, 30, 30, "foo", None)
-        self.vertex2_id = self.insert_vertex(90, 10, 30, 30, "bar", None)
+    def get_cells_to_insert(self):
+        return BaseGraphCase.get_cells_to_insert(self) + [
+            ("vertex1_id", "api.insertVertex", (10, 10, 30, 30, "foo", None)),
+            ("vertex2_id", "api.insertVertex", (90, 10, 30, 30, "bar", None)),
+        ]
 
 
 class Graph2Vertices1EdgeByCode(Graph2Vertices):
-    def __init__(self, selenium, host):
-        Graph2Vertices.__init__(self, selenium, host)
+    def __init__(self, selenium, host, template=None):
+        Graph2Vertices.__init__(self, selenium, host, template)
 
         self.source_id = self.vertex1_id
         self.target_id = self.vertex2_id
-        self.edge_id = self.insert_edge(self.source_id, self.target_id, "edge")
 
+    def get_cells_to_insert(self):
+        return Graph2Vertices.get_cells_to_insert(self) + [
+            (
+                "edge_id",
+                "api.insertEdge",
+                (self.cell_ref("vertex1_id"), self.cell_ref("vertex2_id"), "edge", None, None),
+            ),
+        ]
 
-class Graph3Vertices1EdgeByCode(Graph2Vertices1EdgeByCode):
-    def __init__(self, selenium, host):
-        Graph2Vertices1EdgeByCode.__init__(self, selenium, host)
 
-        self.vertex3_id = self.insert_vertex(10, 90, 30, 30, "fuz", None)
+class Graph3Vertices1EdgeByCode(Graph2Vertices1EdgeByCode):
+    def get_cells_to_insert(self):
+        return Graph2Vertices1EdgeByCode.get_cells_to_insert(self) + [
+            ("vertex3_id", "api.insertVertex", (10, 90, 30, 30, "fuz", None)),
+        ]
 
 
 class Graph3Vertices3EdgesByCode(BaseGraphCase):
-    def __init__(self, selenium, host):
-        BaseGraphCase.__init__(self, selenium, host)
-
-        self.vertex1_id = self.insert_vertex(0, 0, 1, 1, label="foo")
-        self.vertex2_id = self.insert_vertex(100, 0, 1, 1, label="bar")
-        self.vertex3_id = self.insert_vertex(200, 0, 1, 1, label="fuz")
-
-        self.edge1_id = self.insert_edge(self.vertex1_id, self.vertex2_id, "edge1")
-        self.edge2_id = self.insert_edge(self.vertex1_id, self.vertex3_id, "edge2")
-        self.edge3_id = self.insert_edge(self.vertex2_id, self.vertex3_id, "edge3")
+    def get_cells_to_insert(self):
+        ref = self.cell_ref
+        return BaseGraphCase.get_cells_to_insert(self) + [
+            ("vertex1_id", "api.insertVertex", (0, 0, 1, 1, "foo", None, None)),
+            ("vertex2_id", "api.insertVertex", (100, 0, 1, 1, "bar", None, None)),
+            ("vertex3_id", "api.insertVertex", (200, 0, 1, 1, "fuz", None, None)),
+            (
+                "edge1_id",
+                "api.insertEdge",
+                (ref("vertex1_id"), ref("vertex2_id"), "edge1", None, None),
+            ),
+            (
+                "edge2_id",
+                "api.insertEdge",
+                (ref("vertex1_id"), ref("vertex3_id"), "edge2", None, None),
+            ),
+            (
+                "edge3_id",
+                "api.insertEdge",
+                (ref("vertex2_id"), ref("vertex3_id"), "edge3", None, None),
+            ),
+        ]
 
 
 class Graph2Vertices1EdgeByDragDrop(Graph2Vertices):
-    def __init__(self, selenium, host):
-        Graph2Vertices.__init__(self, selenium, host)
+    templatable = False
+
+    def __init__(self, selenium, host, template=None):
+        Graph2Vertices.__init__(self, selenium, host, template)
 
         vertex_foo, vertex_bar = self.get_vertices()
         self.insert_edge_by_drag_drop(vertex_foo, vertex_bar)
 
 
 class Graph2Vertices1Edge1Decoration(Graph2Vertices1EdgeByCode):
-    def __init__(self, selenium, host):
-        Graph2Vertices1EdgeByCode.__init__(self, selenium, host)
-
-        vertices_width = 30
-        vertices_top_border = 10
-        source_left_border = 10
-        source_right_border = source_left_border + vertices_width
-        target_left_border = 90
-        edge_length = target_left_border - source_right_border
-
-        # Decorations must be placed over an edge to work. They are drawn
-        # centered at the point given over edge.
-        x = source_right_border + edge_length * 0.4  # 0.4 along edge.
-        y = vertices_top_border + vertices_width / 2  # edge's y coordinate.
-        w = 10
-        h = 10
+    vertices_width = 30
+    vertices_top_border = 10
+    source_left_border = 10
+    source_right_border = source_left_border + vertices_width
+    target_left_border = 90
+    edge_length = target_left_border - source_right_border
+
+    # Decorations must be placed over an edge to work. They are drawn
+    # centered at the point given over edge.
+    decoration_x = source_right_border + edge_length * 0.4  # 0.4 along edge.
+    decoration_y = vertices_top_border + vertices_width / 2  # edge's y coordinate.
+    decoration_w = 10
+    decoration_h = 10
+
+    def __init__(self, selenium, host, template=None):
+        Graph2Vertices1EdgeByCode.__init__(self, selenium, host, template)
+
+        x, y = self.decoration_x, self.decoration_y
+        w, h = self.decoration_w, self.decoration_h
+        decoration = self.get_decorations()[0]
+        decoration_rect = [int(v) for v in self.get_vertex_rect(decoration)]
+        assert decoration_rect == [x - (w // 2), y - (h // 2), w, h]
+
+    def get_cells_to_insert(self):
+        x, y = self.decoration_x, self.decoration_y
+        w, h = self.decoration_w, self.decoration_h
         style = "purple"
         label = "decoration"
-        self.eval_js_function("api.insertDecoration", x, y, w, h, label, style)
-
-        decoration = self.get_decorations()[0]
-        assert int(decoration.get_attribute("x")) == x - (w // 2)
-        assert int(decoration.get_attribute("y")) == y - (h // 2)
-        assert int(decoration.get_attribute("width")) == w
-        assert int(decoration.get_attribute("height")) == h
+        return Graph2Vertices1EdgeByCode.get_cells_to_insert(self) + [
+            ("decoration_id", "api.insertDecoration", (x, y, w, h, label, style)),
+        ]
 
     def get_decorations(self):
+        return self._lookup("decorations", self._find_decorations)
+
+    def _find_decorations(self):
         style = "purple"
         selector = 'g>g>rect[fill="{}"]'.format(self.host.styles[style]["fill_color"])
         decoration = self.selenium.find_elements(By.CSS_SELECTOR, selector)
@@ -861,22 +1358,8 @@ class Graph2Vertices1Edge1Decoration(Graph2Vertices1EdgeByCode):
 
 
 class Graph2Vertices1Edge1Decoration1Table(Graph2Vertices1Edge1Decoration):
-    def __init__(self, selenium, host):
-        Graph2Vertices1Edge1Decoration.__init__(self, selenium, host)
-
-        x = 20
-        y = 60
-        w = 100
-        contents = {  # graphs.utils.TableDescription
-            "contents": [
-                # graphs.utils.TableDataDescription
-                {"contents": ["arthur", "dent"]},
-                # graphs.utils.TableDataDescription
-                {"contents": ["ford", "prefect"]},
-            ]
-        }
-        title = "Hitchhikers"
-        self.table_id = self.eval_js_function("api.insertTable", x, y, w, contents, title)
+    def __init__(self, selenium, host, template=None):
+        Graph2Vertices1Edge1Decoration.__init__(self, selenium, host, template)
 
         assert self.get_table_title(self.get_tables()[0]) == "Hitchhikers"
         assert self.get_table_contents(self.get_tables()[0]) == [
@@ -886,28 +1369,22 @@ class Graph2Vertices1Edge1Decoration1Table(Graph2Vertices1Edge1Decoration):
             "prefect",
         ]
 
+    def get_cells_to_insert(self):
+        return Graph2Vertices1Edge1Decoration.get_cells_to_insert(self) + [
+            ("table_id", "api.insertTable", _TABLE_CASE_ARGS),
+        ]
+
     def get_tables(self):
+        return self._lookup("tables", self._find_tables)
+
+    def _find_tables(self):
         titles = self.selenium.find_elements(By.CSS_SELECTOR, "div>table.table-cell-title")
         return [web_el.find_element(By.XPATH, "../..") for web_el in titles]
 
 
 class Graph1Table(BaseGraphCase):
-    def __init__(self, selenium, host):
-        BaseGraphCase.__init__(self, selenium, host)
-
-        x = 20
-        y = 60
-        w = 100
-        contents = {  # graphs.utils.TableDescription
-            "contents": [
-                # graphs.utils.TableDataDescription
-                {"contents": ["arthur", "dent"]},
-                # graphs.utils.TableDataDescription
-                {"contents": ["ford", "prefect"]},
-            ]
-        }
-        title = "Hitchhikers"
-        self.eval_js_function("api.insertTable", x, y, w, contents, title)
+    def __init__(self, selenium, host, template=None):
+        BaseGraphCase.__init__(self, selenium, host, template)
 
         assert self.get_table_title(self.get_tables()[0]) == "Hitchhikers"
         assert self.get_table_contents(self.get_tables()[0]) == [
@@ -917,11 +1394,37 @@ class Graph1Table(BaseGraphCase):
             "prefect",
         ]
 
+    def get_cells_to_insert(self):
+        return BaseGraphCase.get_cells_to_insert(self) + [
+            ("table_id", "api.insertTable", _TABLE_CASE_ARGS),
+        ]
+
     def get_tables(self):
+        return self._lookup("tables", self._find_tables)
+
+    def _find_tables(self):
         titles = self.selenium.find_elements(By.CSS_SELECTOR, "div>table.table-cell-title")
         return [web_el.find_element(By.XPATH, "../..") for web_el in titles]
 
 
+# Arguments of `api.insertTable` used by cases with a table: x, y, width,
+# contents and title.
+_TABLE_CASE_ARGS = (
+    20,
+    60,
+    100,
+    {  # graphs.utils.TableDescription
+        "contents": [
+            # graphs.utils.TableDataDescription
+            {"contents": ["arthur", "dent"]},
+            # graphs.utils.TableDataDescription
+            {"contents": ["ford", "prefect"]},
+        ]
+    },
+    "Hitchhikers",
+)
+
+
 def _wait_graph_page_ready(host, selenium):
     """
     Wait until graph page is ready to use, raise if timeout expires.
@@ -967,18 +1470,156 @@ def _wait_graph_page_ready(host, selenium):
             )
         ) from e
 
-    for n in range(timeout):
-        has_api = selenium.execute_script("return !!window.api")
-        if has_api:
-            break
-        else:
-            import time
-
-            time.sleep(0.1)
-    else:
+    # Graph page dispatches an event as soon as graph is ready to use (see
+    # `graphs.runStandAlone`), so there is no need to poll for it.
+    selenium.set_script_timeout(timeout)
+    try:
+        selenium.execute_async_script(
+            "var done = arguments[arguments.length - 1];"
+            "if (window.api) {"
+            "    done();"
+            "} else {"
+            "    document.addEventListener('graph-ready', function() { done(); }, {once: true});"
+            "}"
+        )
+    except timeout_exceptions as e:
         msg = "The page is reported to be loaded in {} but 'api' is not found"
-        raise TimeoutException(msg.format(host.address))
+        raise TimeoutException(msg.format(host.address)) from e
+
+
+def _reset_graph_page(host, selenium, clear_graph=True):
+    """
+    Clears graph page left by a previous graph case, bringing it back to the
+    state it was right after being loaded, as long as page is from same host.
+
+    :type host: qmxgraph.server.Host
+    :type selenium: selenium.webdriver.remote.webdriver.WebDriver
+    :param bool clear_graph: If cells of graph are removed. Not needed when
+        graph is about to be replaced by restoring a dump.
+    :rtype: bool
+    :return: If page could be reused, otherwise it must be loaded again.
+    """
+    return selenium.execute_script(
+        "var state = window.__pageState__;"
+        "if (!state || window.location.href.indexOf(arguments[0]) !== 0) {"
+        "    return false;"
+        "}"
+        "var graph = graphEditor.graph;"
+        "state.listeners.forEach(function(entry) {"
+        "    entry[0].eventListeners = entry[1].slice();"
+        "});"
+        "graph.popupMenuHandler.factoryMethod = state.popupMenuFactory;"
+        # A new root also restarts ids of cells, just like in a new page.
+        "if (arguments[1]) {"
+        "    graph.getModel().clear();"
+        "}"
+        "graphEditor.undoManager.clear();"
+        "api.resetZoom();"
+        "window.__added__ = window.__labels__ = undefined;"
+        "window.__dblClick__ = window.__selectionChange__ = window.__popupMenu__ = undefined;"
+        "return true;",
+        host.address,
+        clear_graph,
+    )
+
+
+def _get_style_color(selenium, default_style, color_key):
+    """
+    :type selenium: selenium.webdriver.remote.webdriver.WebDriver
+    :param str default_style: Name of stylesheet method returning a default
+        style (e.g. "getDefaultVertexStyle").
+    :param str color_key: Name of mxGraph constant of a color key (e.g.
+        "STYLE_FILLCOLOR").
+    :rtype: str
+    :return: Color in lower case, as used by SVG elements in page.
+    """
+    color = selenium.execute_script(
+        f"return graphEditor.graph.getStylesheet().{default_style}()[mxConstants.{color_key}]"
+    )
+    return color.lower()
+
+
+def _wait_css(selector, selenium, timeout=2):
+    """
+    Wait until an element matching a CSS selector is present in page, raise
+    if timeout expires. Unlike implicit waits it returns as soon as element
+    is found.
+
+    :param str selector: A CSS selector.
+    :type selenium: selenium.webdriver.remote.webdriver.WebDriver
+    :param float timeout: Timeout in seconds.
+    :rtype: selenium.webdriver.remote.webelement.WebElement
+    :return: First element found matching selector.
+    """
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    return WebDriverWait(selenium, timeout=timeout).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+    )
 
 
 def _get_port_lock_filename(rootdir):
     return "{}/.port.lock".format(rootdir)
+
+
+def _create_chrome_driver(port):
+    """
+    :param Port port: Provides port used by driver service.
+    :rtype: selenium.webdriver.remote.webdriver.WebDriver
+    :return: A new Chrome WebDriver, configured to run tests.
+    """
+    from selenium.webdriver import Chrome
+    from selenium.webdriver.chrome.service import Service
+
+    driver = Chrome(
+        options=_configure_chrome_options(ChromeOptions()),
+        service=Service(port=port.get()),
+    )
+    # Graph API is synchronous, so scripts return as soon as they are
+    # evaluated. Tests must never pay for implicit waits when looking for
+    # elements (specially when asserting they are absent), explicit waits
+    # (`WebDriverWait`) are used where really needed.
+    driver.implicitly_wait(0)
+    return driver
+
+
+def _configure_chrome_options(chrome_options):
+    """
+    :param ChromeOptions chrome_options: Options to configure.
+    :rtype: ChromeOptions
+    :return: Same options, configured to run Chrome in tests.
+    """
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    # Features never used by graph page, disabled to speed up page loads.
+    # Note that images are never actually needed by tests, they only check
+    # if `img` elements are created (see `test_table_with_image`).
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-default-apps")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    # Browser console and driver logs are only captured when debugging tests,
+    # by setting `QMXGRAPH_TEST_BROWSER_LOGS` environment variable.
+    import os
+
+    log_level = "ALL" if os.environ.get("QMXGRAPH_TEST_BROWSER_LOGS") else "OFF"
+    chrome_options.set_capability(
+        "goog:loggingPrefs", {"browser": log_level, "driver": log_level, "performance": "OFF"}
+    )
+    # Comment `--headless` and uncomment `--auto-open-devtools-for-tabs` to be
+    # able to debug the javascript from tests using selenium.
+    chrome_options.add_argument("--headless")
+    # chrome_options.add_argument("--auto-open-devtools-for-tabs")
+    return chrome_options
+
+
+def _is_xdist_slave(config):
+    """
+    :rtype: bool
+    :return: If running in a pytest-xdist slave process.
+    """
+    return hasattr(config, "workerinput")
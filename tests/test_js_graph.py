@@ -1,4 +1,5 @@
 import math
+import textwrap
 from typing import Any
 from typing import List
 
@@ -8,6 +9,7 @@ from selenium.common.exceptions import WebDriverException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.wait import WebDriverWait
 
 import qmxgraph.constants
 from qmxgraph import constants
@@ -17,6 +19,14 @@ from qmxgraph.api import QmxGraphApi
 from qmxgraph.configuration import GraphOptions
 from qmxgraph.configuration import GraphStyles
 
+# CSS selectors of elements looked up by tests.
+GROUP_RECT_SELECTOR_FMT = 'g>g>rect[fill="{}"]'
+MX_WINDOW = "div.mxWindow"
+GRAPH_CONTAINER = "div.graph"
+TABLE_IMG = ".table-cell-contents img"
+CUSTOM_SHAPE = 'g>g>path[fill="#ffff00"]'
+HELVETICA_LABEL = 'div[style*="font-family:"][style*="Helvetica"]'
+
 
 def test_resize_container(graph_cases) -> None:
     """
@@ -89,40 +99,53 @@ def test_dump_restore(dumped, restored, graph_cases) -> None:
     assert dumped_vertices_count == len(graph.get_vertices())
 
 
-def test_insert_vertex_with_style(graph_cases) -> None:
+def test_insert_vertex_with_style(graph_cases, default_vertex_fill) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
+    :type default_vertex_fill: str
     """
     graph = graph_cases("1v_style")
     vertex = graph.get_vertex()
 
     # Can't have same color as default vertex style
-    default = graph.selenium.execute_script(
-        "return graphEditor.graph.getStylesheet().getDefaultVertexStyle()[mxConstants.STYLE_FILLCOLOR]"  # noqa
-    )
-    default = default.lower()
+    assert vertex.get_attribute("fill") != default_vertex_fill
 
-    assert vertex.get_attribute("fill") != default
 
-
-@pytest.mark.parametrize(
-    "mode",
-    [
-        "by_code",
-        "by_drag_drop",
-    ],
+# Cases with an edge inserted in different modes, used by indirect
+# parametrization of `edge_graph` and `styled_edge_graph` fixtures.
+parametrize_edge_modes = pytest.mark.parametrize(
+    "edge_case",
+    ["2v_1e", "2v_1eDD"],
+    ids=["by_code", "by_drag_drop"],
+    indirect=True,
 )
-def test_insert_edge(graph_cases, mode) -> None:
+
+
+@pytest.fixture
+def edge_case(request):
+    """
+    :rtype: str
+    :return: Name of a graph case with an edge, given by parametrization.
+    """
+    return request.param
+
+
+@pytest.fixture
+def edge_graph(graph_cases, edge_case):
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
+    :type edge_case: str
+    :rtype: qmxgraph.tests.conftest.BaseGraphCase
     """
-    if mode == "by_code":
-        case = "2v_1e"
-    else:
-        assert mode == "by_drag_drop"
-        case = "2v_1eDD"
-    graph = graph_cases(case)
-    assert graph.get_edge(*graph.get_vertices()) is not None
+    return graph_cases(edge_case)
+
+
+@parametrize_edge_modes
+def test_insert_edge(edge_graph) -> None:
+    """
+    :type edge_graph: qmxgraph.tests.conftest.BaseGraphCase
+    """
+    assert edge_graph.get_edge(*edge_graph.get_vertices()) is not None
 
 
 def test_get_terminal_points(graph_cases) -> None:
@@ -206,6 +229,16 @@ def test_get_decoration_parent_cell_id(graph_cases) -> None:
 
 
 def test_delete_vertex(graph_cases) -> None:
+    """
+    :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
+    """
+    graph = graph_cases("1v")
+    graph.eval_js_function("api.removeCells", [graph.vertex_id])
+
+    assert not graph.get_vertex()
+
+
+def test_delete_vertex_via_keyboard(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
     """
@@ -225,12 +258,9 @@ def test_delete_edge(graph_cases) -> None:
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
     """
     graph = graph_cases("2v_1e")
-    graph.select_edge(graph.get_edge(*graph.get_vertices()))
+    assert graph.get_edge(*graph.get_vertices())
 
-    actions = ActionChains(graph.selenium)
-    actions.key_down(Keys.DELETE)
-    actions.key_up(Keys.DELETE)
-    actions.perform()
+    graph.eval_js_function("api.removeCells", [graph.edge_id])
 
     assert not graph.get_edge(*graph.get_vertices())
 
@@ -241,33 +271,21 @@ def test_group(graph_cases) -> None:
     """
     graph = graph_cases("2v")
 
-    actions = ActionChains(graph.selenium)
-    actions.key_down(Keys.CONTROL)
-    actions.perform()
-
-    vertex_foo, vertex_bar = graph.get_vertices()
-    graph.select_vertex(vertex_foo)
-    graph.select_vertex(vertex_bar)
-
-    actions = ActionChains(graph.selenium)
-    actions.key_up(Keys.CONTROL)
-    actions.perform()
+    graph.eval_js_function("api.setSelectedCells", [graph.vertex1_id, graph.vertex2_id])
 
     # Group selected vertices
     graph.selenium.execute_script("api.group()")
 
     group_fill = graph.host.styles["group"]["fill_color"]
-    group_selector = 'g>g>rect[fill="{}"]'.format(group_fill)
-    group = graph.selenium.find_elements(By.CSS_SELECTOR, group_selector)
-    assert len(group) == 1
+    group_selector = GROUP_RECT_SELECTOR_FMT.format(group_fill)
+    assert graph.count_elements(group_selector) == 1
 
     # Ungroup selected vertices
     graph.selenium.execute_script("api.ungroup()")
-    group = graph.selenium.find_elements(By.CSS_SELECTOR, group_selector)
-    assert not group
+    assert graph.count_elements(group_selector) == 0
 
 
-def test_toggle_outline(selenium, host, wait_graph_page_ready) -> None:
+def test_toggle_outline(selenium, host, wait_graph_page_ready, wait_css) -> None:
     """
     :type selenium: selenium.webdriver.remote.webdriver.WebDriver
     :type host: qmxgraph.server.Host
@@ -277,21 +295,21 @@ def test_toggle_outline(selenium, host, wait_graph_page_ready) -> None:
     # By default, outline starts hidden. Basically this means mxGraph's window
     # component used to shown outline doesn't exist yet.
     with pytest.raises(NoSuchElementException):
-        selenium.find_element(By.CSS_SELECTOR, "div.mxWindow")
+        selenium.find_element(By.CSS_SELECTOR, MX_WINDOW)
 
     # Once shown, outline is displayed in a mxGraph's window component
     selenium.execute_script("api.toggleOutline()")
-    outline = selenium.find_element(By.CSS_SELECTOR, "div.mxWindow")
+    outline = wait_css(MX_WINDOW)
     assert outline is not None
 
     # However once toggled back to hidden, it is not destroyed but simply
     # hidden
     selenium.execute_script("api.toggleOutline()")
-    assert not outline.is_displayed()
+    WebDriverWait(selenium, timeout=2).until_not(lambda _: outline.is_displayed())
 
 
 @pytest.mark.parametrize("grid", [True, False])
-def test_toggle_grid(selenium, host, grid, wait_graph_page_ready) -> None:
+def test_toggle_grid(selenium, host, grid, wait_graph_page_ready, wait_css) -> None:
     """
     :type selenium: selenium.webdriver.remote.webdriver.WebDriver
     :type host: qmxgraph.server.Host
@@ -303,13 +321,30 @@ def test_toggle_grid(selenium, host, grid, wait_graph_page_ready) -> None:
     if not grid:
         selenium.execute_script("api.toggleGrid()")
 
-    container = selenium.find_element(By.CSS_SELECTOR, "div.graph")
+    container = wait_css(GRAPH_CONTAINER)
     assert container.get_attribute("id") == "graphContainer"
     assert container.get_attribute("class") == ("graph" if grid else "graph hide-bg")
 
 
 @pytest.mark.parametrize("snap", [True, False])
 def test_toggle_snap(graph_cases, snap) -> None:
+    """
+    :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
+    """
+    graph = graph_cases("empty")
+
+    # By default snap is enabled. Snapping moved cells to grid is actually
+    # done by mxGraph when enabled, see `test_toggle_snap_by_drag` for the
+    # effects of snap when user drags a vertex.
+    script = "return graphEditor.graph.isGridEnabled()"
+    if not snap:
+        script = "api.toggleSnap(); " + script
+    assert graph.selenium.execute_script(script) == snap
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("snap", [True, False])
+def test_toggle_snap_by_drag(graph_cases, snap) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
     """
@@ -322,8 +357,7 @@ def test_toggle_snap(graph_cases, snap) -> None:
         selenium.execute_script("api.toggleSnap()")
 
     vertex = graph.get_vertex()
-    x, y = graph.get_vertex_position(vertex)
-    w, h = graph.get_vertex_size(vertex)
+    x, y, w, h = graph.get_vertex_rect(vertex)
 
     actions = ActionChains(selenium)
     actions.move_to_element(vertex)
@@ -339,10 +373,11 @@ def test_toggle_snap(graph_cases, snap) -> None:
             result = math.ceil(result / 10.0) * 10
         return result
 
-    assert int(vertex.get_attribute("width")) == w
-    assert int(vertex.get_attribute("height")) == h
-    assert int(vertex.get_attribute("x")) == expected(x)
-    assert int(vertex.get_attribute("y")) == expected(y)
+    new_x, new_y, new_w, new_h = graph.get_vertex_rect(vertex)
+    assert int(new_w) == w
+    assert int(new_h) == h
+    assert int(new_x) == expected(x)
+    assert int(new_y) == expected(y)
 
 
 def test_get_cell_id_at(graph_cases) -> None:
@@ -354,15 +389,19 @@ def test_get_cell_id_at(graph_cases) -> None:
     # mxGraph shares a global id counter for all cell types. The first
     # non-reserved id is 2, as lower values are used by internal control
     # structures.
-    assert graph.get_id(graph.get_vertices()[0]) == "2"
-    assert graph.get_id(graph.get_vertices()[1]) == "3"
-    assert graph.get_id(graph.get_edge(*graph.get_vertices())) == "4"
-    assert graph.get_id(graph.get_decorations()[0]) == "5"
-    assert graph.get_id(graph.get_tables()[0]) == "6"
+    vertices = graph.get_vertices()
+    assert graph.get_id(vertices[0]) == "2"
+    ids = graph.get_ids(
+        vertices[1],
+        graph.get_edge(*vertices),
+        graph.get_decorations()[0],
+        graph.get_tables()[0],
+    )
+    assert ids == ["3", "4", "5", "6"]
 
     class Invalid:
         def __init__(self):
-            self.location = {"x": 999, "y": 999}
+            self.rect = {"x": 999, "y": 999, "width": 0, "height": 0}
 
     assert graph.get_id(Invalid()) is None
 
@@ -384,11 +423,12 @@ def test_set_visible(graph_cases) -> None:
     assert len(graph.get_vertices()) == len(vertices)
 
     # hide then show edge again
-    cell_id = graph.get_id(graph.get_edge(*graph.get_vertices()))
+    vertices = graph.get_vertices()
+    cell_id = graph.get_id(graph.get_edge(*vertices))
     graph.set_visible(cell_id, False)
-    assert graph.get_edge(*graph.get_vertices()) is None
+    assert graph.get_edge(*vertices) is None
     graph.set_visible(cell_id, True)
-    assert graph.get_edge(*graph.get_vertices()) is not None
+    assert graph.get_edge(*vertices) is not None
 
     # Hide then show decoration again
     cell_id = graph.get_id(graph.get_decorations()[0])
@@ -410,7 +450,7 @@ def test_is_and_set_port_visible(graph_cases) -> None:
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
     """
     graph = graph_cases("1v_1p")
-    vertex_id = graph.get_id(graph.get_vertex())
+    vertex_id = graph.vertex_id
 
     assert graph.eval_js_function("api.isPortVisible", vertex_id, "foo")
     assert graph.get_port() is not None
@@ -458,12 +498,15 @@ def test_get_geometry_plain(graph_cases) -> None:
     """
     graph = graph_cases("2v_1e_1d_1t")
 
-    assert graph.get_geometry(graph.get_vertices()[0]) == [10, 10, 30, 30]
-    assert graph.get_geometry(graph.get_edge(*graph.get_vertices())) == [40, 25, 50, 1]
-    assert graph.get_geometry(graph.get_decorations()[0]) == [55, 20, 10, 10]
+    info = graph.get_cells_info(
+        graph.vertex1_id, graph.edge_id, graph.decoration_id, graph.table_id
+    )
+    assert info[graph.vertex1_id]["geometry"] == [10, 10, 30, 30]
+    assert info[graph.edge_id]["geometry"] == [40, 25, 50, 1]
+    assert info[graph.decoration_id]["geometry"] == [55, 20, 10, 10]
     # Table geometry is dependent on how the contents are rendered.
     # Using `pytest.approx` to account for platform differences.
-    obtained_table_geometry = graph.get_geometry(graph.get_tables()[0])
+    obtained_table_geometry = info[graph.table_id]["geometry"]
     assert pytest.approx(obtained_table_geometry, rel=0.1) == [20, 60, 100, 70]
 
 
@@ -572,7 +615,7 @@ def test_table_with_image(graph_cases) -> None:
     }
     graph.eval_js_function("api.updateTable", table_id, contents, "")
 
-    image_elements = graph.selenium.find_elements(By.CSS_SELECTOR, ".table-cell-contents img")
+    image_elements = graph.selenium.find_elements(By.CSS_SELECTOR, TABLE_IMG)
     assert len(image_elements) == 1
     image = image_elements[0]
     assert image.get_attribute("src").endswith("some-image-path")
@@ -594,6 +637,7 @@ def test_update_table(graph_cases) -> None:
     }
     title = "updated"
     graph.selenium.execute_script(js.prepare_js_call("api.updateTable", table_id, contents, title))
+    graph.invalidate()
 
     table = graph.get_tables()[0]
     assert graph.get_table_title(table) == "updated"
@@ -645,10 +689,7 @@ def test_remove_cells(graph_cases) -> None:
     graph = graph_cases("2v_1e")
 
     vertices = graph.get_vertices()
-    cell_ids = [
-        graph.get_id(vertices[0]),
-        graph.get_id(graph.get_edge(*vertices)),
-    ]
+    cell_ids = graph.get_ids(vertices[0], graph.get_edge(*vertices))
     graph.eval_js_function("api.removeCells", cell_ids)
 
     assert len(graph.get_vertices()) == 1
@@ -678,16 +719,14 @@ def test_on_cells_removed(graph_cases) -> None:
     graph.selenium.execute_script("callback = function(cellIds) {window.cellIds = cellIds;}")
     graph.eval_js_function("api.registerCellsRemovedHandler", js.Variable("callback"))
 
-    cell_ids = [
-        graph.get_id(graph.get_vertices()[0]),
-        graph.get_id(graph.get_edge(*graph.get_vertices())),
-    ]
+    vertices = graph.get_vertices()
+    cell_ids = graph.get_ids(vertices[0], graph.get_edge(*vertices))
     graph.eval_js_function("api.removeCells", cell_ids)
 
     assert graph.selenium.execute_script("return window.cellIds") == cell_ids
 
 
-def test_custom_shapes(selenium, port, tmpdir, wait_graph_page_ready) -> None:
+def test_custom_shapes(selenium, port, tmpdir, wait_graph_page_ready, wait_css) -> None:
     """
     :type selenium: selenium.webdriver.remote.webdriver.WebDriver
     :type port: qmxgraph.tests.conftest.Port
@@ -727,28 +766,21 @@ def test_custom_shapes(selenium, port, tmpdir, wait_graph_page_ready) -> None:
         }
     )
 
-    def has_custom_shape():
-        return bool(selenium.find_elements(By.CSS_SELECTOR, 'g>g>path[fill="#ffff00"]'))
-
     with server.host(port=port.get(), styles=styles, stencils=stencils) as host:
         wait_graph_page_ready(host=host)
-        assert not has_custom_shape()
+        assert not selenium.find_elements(By.CSS_SELECTOR, CUSTOM_SHAPE)
         selenium.execute_script("api.insertVertex(10, 10, 20, 20, 'custom', 'moon')")
-        assert has_custom_shape()
+        assert wait_css(CUSTOM_SHAPE) is not None
 
 
-@pytest.mark.parametrize(
-    "mode",
-    [
-        "by_code",
-        "by_drag_drop",
-    ],
-)
-def test_edge_with_style(port, mode, graph_cases_factory) -> None:
+@pytest.fixture(scope="module")
+def edge_style_host(port):
     """
+    Hosts a graph page with a custom edge style, shared by all tests in
+    module as hosting a page is expensive.
+
     :type port: qmxgraph.tests.conftest.Port
-    :type mode: str
-    :type graph_cases_factory: callable
+    :rtype: qmxgraph.server.Host
     """
     styles = GraphStyles(
         {
@@ -759,9 +791,29 @@ def test_edge_with_style(port, mode, graph_cases_factory) -> None:
     )
 
     with server.host(port=port.get(), styles=styles) as host:
-        cases = graph_cases_factory(host)
-        graph = cases("2v_1e" if mode == "by_code" else "2v_1eDD")
-        assert graph.get_edge(*graph.get_vertices()).get_attribute("stroke") == "#000000"
+        yield host
+
+
+@pytest.fixture
+def styled_edge_graph(edge_style_host, graph_cases_factory, edge_case):
+    """
+    :type edge_style_host: qmxgraph.server.Host
+    :type graph_cases_factory: callable
+    :type edge_case: str
+    :rtype: qmxgraph.tests.conftest.BaseGraphCase
+    """
+    return graph_cases_factory(edge_style_host)(edge_case)
+
+
+# Both modes share the same module host, so they run in the same xdist worker.
+@pytest.mark.xdist_group(name="edge_style_host")
+@parametrize_edge_modes
+def test_edge_with_style(styled_edge_graph) -> None:
+    """
+    :type styled_edge_graph: qmxgraph.tests.conftest.BaseGraphCase
+    """
+    graph = styled_edge_graph
+    assert graph.get_edge(*graph.get_vertices()).get_attribute("stroke") == "#000000"
 
 
 def test_get_label(graph_cases) -> None:
@@ -770,34 +822,26 @@ def test_get_label(graph_cases) -> None:
     """
     graph = graph_cases("2v_1e_1d_1t")
 
-    assert graph.get_label(graph.get_vertices()[0]) == "foo"
-    assert graph.get_label(graph.get_vertices()[1]) == "bar"
-    assert graph.get_label(graph.get_edge(*graph.get_vertices())) == "edge"
-    assert graph.get_label(graph.get_decorations()[0]) == "decoration"
+    info = graph.get_cells_info(
+        graph.vertex1_id, graph.vertex2_id, graph.edge_id, graph.decoration_id, graph.table_id
+    )
+    assert info[graph.vertex1_id]["label"] == "foo"
+    assert info[graph.vertex2_id]["label"] == "bar"
+    assert info[graph.edge_id]["label"] == "edge"
+    assert info[graph.decoration_id]["label"] == "decoration"
 
     # Tables use a complex label in HTML
-    table_label = graph.get_label(graph.get_tables()[0])
-
-    table_html_data = []
+    table_label = info[graph.table_id]["label"]
 
+    # Tags used are considered implementation detail, only text data matters
+    # (tags are already ignored by default by `HTMLParser`).
     from html.parser import HTMLParser
 
-    class TableHTMLParser(HTMLParser):
-        def handle_starttag(self, tag, attrs):
-            # tags used are considered implementation detail, don't care
-            # about it
-            pass
-
-        def handle_endtag(self, tag):
-            # tags used are considered implementation detail, don't care
-            # about it
-            pass
-
-        def handle_data(self, data):
-            table_html_data.append(data)
-
-    parser = TableHTMLParser()
+    table_html_data = []
+    parser = HTMLParser()
+    parser.handle_data = table_html_data.append
     parser.feed(table_label)
+    parser.close()
     assert table_html_data == ["Hitchhikers", "arthur", "dent", "ford", "prefect"]
 
 
@@ -833,17 +877,13 @@ def test_get_cell_type(graph_cases) -> None:
     """
     graph = graph_cases("2v_1e_1d_1t")
 
-    def get_cell_type(web_element):
-        cell_id = graph.get_id(web_element)
-        return graph.eval_js_function("api.getCellType", cell_id)
-
-    assert get_cell_type(graph.get_vertices()[0]) == constants.CELL_TYPE_VERTEX
-
-    assert get_cell_type(graph.get_edge(*graph.get_vertices())) == constants.CELL_TYPE_EDGE
-
-    assert get_cell_type(graph.get_decorations()[0]) == constants.CELL_TYPE_DECORATION
-
-    assert get_cell_type(graph.get_tables()[0]) == constants.CELL_TYPE_TABLE
+    info = graph.get_cells_info(
+        graph.vertex1_id, graph.edge_id, graph.decoration_id, graph.table_id
+    )
+    assert info[graph.vertex1_id]["type"] == constants.CELL_TYPE_VERTEX
+    assert info[graph.edge_id]["type"] == constants.CELL_TYPE_EDGE
+    assert info[graph.decoration_id]["type"] == constants.CELL_TYPE_DECORATION
+    assert info[graph.table_id]["type"] == constants.CELL_TYPE_TABLE
 
 
 def test_get_cell_type_error_not_found(graph_cases, selenium_extras) -> None:
@@ -861,21 +901,23 @@ def test_get_cell_type_error_not_found(graph_cases, selenium_extras) -> None:
     assert f"Unable to find cell with id {cell_id}" in selenium_extras.get_exception_message(e)
 
 
-@pytest.mark.parametrize(
-    "cell_type",
-    [
-        qmxgraph.constants.CELL_TYPE_VERTEX,
-        qmxgraph.constants.CELL_TYPE_EDGE,
-        qmxgraph.constants.CELL_TYPE_TABLE,
-        qmxgraph.constants.CELL_TYPE_DECORATION,
-    ],
+# Every cell type supporting tags. Tests exercising tags insert a cell of each
+# type in a same graph, instead of being parametrized by cell type, as setting
+# up a graph case is way more expensive than the tags checks themselves. The
+# "2v" case is used so edges connect its vertices instead of new ones.
+TAGGABLE_CELL_TYPES = (
+    qmxgraph.constants.CELL_TYPE_VERTEX,
+    qmxgraph.constants.CELL_TYPE_EDGE,
+    qmxgraph.constants.CELL_TYPE_TABLE,
+    qmxgraph.constants.CELL_TYPE_DECORATION,
 )
-def test_insert_with_tags(graph_cases, cell_type) -> None:
+
+
+def test_insert_with_tags(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type cell_type: qmxgraph.constants.CELL_TYPE_*
     """
-    graph = graph_cases("empty")
+    graph = graph_cases("2v")
 
     # Listen to on cells added event to be sure tags are already configured
     # as soon as cell is created
@@ -891,172 +933,119 @@ def test_insert_with_tags(graph_cases, cell_type) -> None:
     graph.eval_js_function("api.registerCellsAddedHandler", js.Variable("callback"))
     tags = {"tagTest": "1"}
 
-    cell_id = insert_by_parametrized_type(graph, cell_type, tags=tags)
+    for cell_type in TAGGABLE_CELL_TYPES:
+        cell_id = insert_by_parametrized_type(graph, cell_type, tags=tags)
 
-    assert (
-        graph.selenium.execute_script("return api.getTag({}, 'tagTest')".format(cell_id))
-        == tags["tagTest"]
-    )
-    assert graph.selenium.execute_script("return window.tags") == [tags["tagTest"]]
+        get_tag = js.prepare_js_call("api.getTag", cell_id, "tagTest")
+        cell_tag, added_tags = graph.selenium.execute_script(f"return [{get_tag}, window.tags];")
+        assert cell_tag == tags["tagTest"], cell_type
+        assert added_tags == [tags["tagTest"]], cell_type
 
 
-@pytest.mark.parametrize(
-    "cell_type",
-    [
-        qmxgraph.constants.CELL_TYPE_VERTEX,
-        qmxgraph.constants.CELL_TYPE_EDGE,
-        qmxgraph.constants.CELL_TYPE_TABLE,
-        qmxgraph.constants.CELL_TYPE_DECORATION,
-    ],
-)
-def test_insert_with_tags_error_value_not_string(graph_cases, cell_type, selenium_extras) -> None:
+def test_insert_with_tags_error_value_not_string(graph_cases, selenium_extras) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type cell_type: qmxgraph.constants.CELL_TYPE_*
     :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
-    graph = graph_cases("empty")
+    graph = graph_cases("2v")
 
     tag_name = "tagTest"
     tags = {tag_name: 999}
 
-    with pytest.raises(WebDriverException) as e:
-        insert_by_parametrized_type(graph, cell_type, tags=tags)
+    for cell_type in TAGGABLE_CELL_TYPES:
+        with pytest.raises(WebDriverException) as e:
+            insert_by_parametrized_type(graph, cell_type, tags=tags)
 
-    assert f"Tag '{tag_name}' is not a string" in selenium_extras.get_exception_message(e)
+        message = selenium_extras.get_exception_message(e)
+        assert f"Tag '{tag_name}' is not a string" in message, cell_type
 
 
-@pytest.mark.parametrize(
-    "cell_type",
-    [
-        qmxgraph.constants.CELL_TYPE_VERTEX,
-        qmxgraph.constants.CELL_TYPE_EDGE,
-        qmxgraph.constants.CELL_TYPE_TABLE,
-        qmxgraph.constants.CELL_TYPE_DECORATION,
-    ],
-)
-def test_set_get_tag(graph_cases, cell_type) -> None:
+def test_set_get_tag(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type cell_type: qmxgraph.constants.CELL_TYPE_*
     """
-    graph = graph_cases("empty")
+    graph = graph_cases("2v")
 
-    cell_id = insert_by_parametrized_type(graph, cell_type)
+    for cell_type in TAGGABLE_CELL_TYPES:
+        cell_id = insert_by_parametrized_type(graph, cell_type)
 
-    assert not graph.eval_js_function("api.hasTag", cell_id, "test")
-    graph.eval_js_function("api.setTag", cell_id, "test", "foo")
-    assert graph.eval_js_function("api.hasTag", cell_id, "test")
-    assert graph.eval_js_function("api.getTag", cell_id, "test") == "foo"
+        assert not graph.eval_js_function("api.hasTag", cell_id, "test"), cell_type
+        graph.eval_js_function("api.setTag", cell_id, "test", "foo")
+        assert graph.eval_js_function("api.hasTag", cell_id, "test"), cell_type
+        assert graph.eval_js_function("api.getTag", cell_id, "test") == "foo", cell_type
 
 
-@pytest.mark.parametrize(
-    "cell_type",
-    [
-        qmxgraph.constants.CELL_TYPE_VERTEX,
-        qmxgraph.constants.CELL_TYPE_EDGE,
-        qmxgraph.constants.CELL_TYPE_TABLE,
-        qmxgraph.constants.CELL_TYPE_DECORATION,
-    ],
-)
-def test_set_get_tag_error_tag_not_found(graph_cases, cell_type, selenium_extras) -> None:
+def test_set_get_tag_error_tag_not_found(graph_cases, selenium_extras) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type cell_type: qmxgraph.constants.CELL_TYPE_*
     :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
-    graph = graph_cases("empty")
+    graph = graph_cases("2v")
 
-    cell_id = insert_by_parametrized_type(graph, cell_type)
-    tag_name = "test"
-    assert not graph.eval_js_function("api.hasTag", cell_id, tag_name)
+    for cell_type in TAGGABLE_CELL_TYPES:
+        cell_id = insert_by_parametrized_type(graph, cell_type)
+        tag_name = "test"
+        assert not graph.eval_js_function("api.hasTag", cell_id, tag_name), cell_type
 
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.getTag", cell_id, tag_name)
+        with pytest.raises(WebDriverException) as e:
+            graph.eval_js_function("api.getTag", cell_id, tag_name)
 
-    assert (
-        f"Tag '{tag_name}' not found in cell with id {cell_id}"
-        in selenium_extras.get_exception_message(e)
-    )
+        message = selenium_extras.get_exception_message(e)
+        assert f"Tag '{tag_name}' not found in cell with id {cell_id}" in message, cell_type
 
 
-@pytest.mark.parametrize(
-    "cell_type",
-    [
-        qmxgraph.constants.CELL_TYPE_VERTEX,
-        qmxgraph.constants.CELL_TYPE_EDGE,
-        qmxgraph.constants.CELL_TYPE_TABLE,
-        qmxgraph.constants.CELL_TYPE_DECORATION,
-    ],
-)
-def test_set_get_tag_error_value_not_string(graph_cases, cell_type, selenium_extras) -> None:
+def test_set_get_tag_error_value_not_string(graph_cases, selenium_extras) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type cell_type: qmxgraph.constants.CELL_TYPE_*
     :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
-    graph = graph_cases("empty")
+    graph = graph_cases("2v")
 
-    cell_id = insert_by_parametrized_type(graph, cell_type)
-    tag_name = "test"
+    for cell_type in TAGGABLE_CELL_TYPES:
+        cell_id = insert_by_parametrized_type(graph, cell_type)
+        tag_name = "test"
 
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.setTag", cell_id, tag_name, 999)
+        with pytest.raises(WebDriverException) as e:
+            graph.eval_js_function("api.setTag", cell_id, tag_name, 999)
 
-    assert f"Tag '{tag_name}' is not a string" in selenium_extras.get_exception_message(e)
+        message = selenium_extras.get_exception_message(e)
+        assert f"Tag '{tag_name}' is not a string" in message, cell_type
 
 
-@pytest.mark.parametrize(
-    "cell_type",
-    [
-        qmxgraph.constants.CELL_TYPE_VERTEX,
-        qmxgraph.constants.CELL_TYPE_EDGE,
-        qmxgraph.constants.CELL_TYPE_TABLE,
-        qmxgraph.constants.CELL_TYPE_DECORATION,
-    ],
-)
-def test_set_get_tag_doesnt_overwrite_protected_tags(graph_cases, cell_type) -> None:
+def test_set_get_tag_doesnt_overwrite_protected_tags(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type cell_type: qmxgraph.constants.CELL_TYPE_*
     """
-    graph = graph_cases("empty")
+    graph = graph_cases("2v")
 
-    cell_id = insert_by_parametrized_type(graph, cell_type)
-    assert not graph.eval_js_function("api.hasTag", cell_id, "label")
+    for cell_type in TAGGABLE_CELL_TYPES:
+        cell_id = insert_by_parametrized_type(graph, cell_type)
+        assert not graph.eval_js_function("api.hasTag", cell_id, "label"), cell_type
 
-    graph.eval_js_function("api.setTag", cell_id, "label", "test")
-    assert graph.eval_js_function("api.hasTag", cell_id, "label")
-    assert graph.eval_js_function("api.getTag", cell_id, "label") == "test"
-    assert graph.eval_js_function("api.getTag", cell_id, "label") != graph.get_label(cell_id)
+        graph.eval_js_function("api.setTag", cell_id, "label", "test")
+        assert graph.eval_js_function("api.hasTag", cell_id, "label"), cell_type
+        assert graph.eval_js_function("api.getTag", cell_id, "label") == "test", cell_type
+        label = graph.get_label(cell_id)
+        assert graph.eval_js_function("api.getTag", cell_id, "label") != label, cell_type
 
 
-def test_set_get_tag_error_cell_not_found(graph_cases, selenium_extras) -> None:
+def test_set_get_tag_error_cell_not_found(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
     graph = graph_cases("empty")
 
     cell_id = "999"
 
-    # Try to add tag to non exiting cell.
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.setTag", cell_id, "test", "foo")
-
-    assert f"Unable to find cell with id {cell_id}" in selenium_extras.get_exception_message(e)
-
-    # Try to get tag from non exiting cell.
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.getTag", cell_id, "test")
-
-    assert f"Unable to find cell with id {cell_id}" in selenium_extras.get_exception_message(e)
-
-    # Try to check if tag exist in non exiting cell.
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.hasTag", cell_id, "test")
-
-    assert f"Unable to find cell with id {cell_id}" in selenium_extras.get_exception_message(e)
+    # Try to add, get and check if tag exist in non exiting cell.
+    errors = graph.collect_js_errors(
+        [
+            ("api.setTag", (cell_id, "test", "foo")),
+            ("api.getTag", (cell_id, "test")),
+            ("api.hasTag", (cell_id, "test")),
+        ]
+    )
+    assert errors == [f"Unable to find cell with id {cell_id}"] * 3
 
 
 def test_set_get_tag_without_initial_tag_support(graph_cases) -> None:
@@ -1087,39 +1076,70 @@ def test_on_cells_added(graph_cases) -> None:
     """
     graph = graph_cases("2v_1e_1d_1t")
 
-    added = [
-        graph.get_id(graph.get_vertices()[0]),
-        graph.get_id(graph.get_vertices()[1]),
-        graph.get_id(graph.get_edge(*graph.get_vertices())),
-        graph.get_id(graph.get_decorations()[0]),
-        graph.get_id(graph.get_tables()[0]),
-    ]
+    vertices = graph.get_vertices()
+    added = graph.get_ids(
+        vertices[0],
+        vertices[1],
+        graph.get_edge(*vertices),
+        graph.get_decorations()[0],
+        graph.get_tables()[0],
+    )
 
     assert graph.get_added_cell_ids() == added
 
 
+def _edit_label_via_js(graph, cell_id, new_label):
+    """
+    Edits label of a cell the same way a user would through the in-place
+    editor, but in a single script instead of a chain of simulated user
+    interactions.
+
+    :type graph: qmxgraph.tests.conftest.BaseGraphCase
+    :param str cell_id: Id of cell being edited.
+    :param str new_label: Label typed in editor and confirmed.
+    """
+    graph.selenium.execute_script(
+        "var graph = graphEditor.graph;"
+        "graph.startEditingAtCell(graph.getModel().getCell(arguments[0]));"
+        "graph.cellEditor.textarea.textContent = arguments[1];"
+        "graph.stopEditing(false);",
+        cell_id,
+        new_label,
+    )
+    graph.invalidate()
+
+
+def _wait_label_changes(graph, count):
+    """
+    Polls captured label changes instead of relying on implicit waits, which
+    are disabled in tests.
+
+    :type graph: qmxgraph.tests.conftest.BaseGraphCase
+    :param int count: Minimum number of label changes waited for.
+    """
+    WebDriverWait(graph.selenium, timeout=2).until(
+        lambda driver: len(driver.execute_script("return window.__labels__ || []")) >= count
+    )
+
+
 def test_on_label_changed(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
     """
     graph = graph_cases("1v")
-    vertex_id = graph.get_id(graph.get_vertex())
+    vertex_id = graph.vertex_id
 
     # Sanity check: custom tags are internally stored in same node element as
     # label. This is to make sure tags aren't lost when label is changed by
     # mistakenly overwriting whole node element instead of just label.
     graph.eval_js_function("api.setTag", vertex_id, "test", "test")
 
-    label = graph.get_label(graph.get_vertex())
-    label_element = graph.get_label_element(graph.get_vertex())
+    label = graph.get_label(vertex_id)
 
-    actions = ActionChains(graph.selenium)
-    actions.double_click(label_element)
-    actions.send_keys("foo")
-    actions.click(graph.get_container())  # to lose focus and confirm
-    actions.perform()
+    _edit_label_via_js(graph, vertex_id, "foo")
 
-    assert graph.get_label(graph.get_vertex()) == "foo"
+    assert graph.get_label(vertex_id) == "foo"
+    _wait_label_changes(graph, 1)
     label_changes = graph.get_label_changes()
     assert label_changes == [
         {
@@ -1137,12 +1157,13 @@ def test_set_label(graph_cases) -> None:
     """
     graph = graph_cases("1v")
 
-    vertex_id = graph.get_id(graph.get_vertex())
-    label = graph.get_label(graph.get_vertex())
+    vertex_id = graph.vertex_id
+    label = graph.get_label(vertex_id)
 
     graph.eval_js_function("api.setLabel", vertex_id, "foo")
 
-    assert graph.get_label(graph.get_vertex()) == "foo"
+    assert graph.get_label(vertex_id) == "foo"
+    _wait_label_changes(graph, 1)
     label_changes = graph.get_label_changes()
     assert label_changes == [
         {
@@ -1153,18 +1174,15 @@ def test_set_label(graph_cases) -> None:
     ]
 
 
-def test_set_label_error_not_found(graph_cases, selenium_extras) -> None:
+def test_set_label_error_not_found(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
     graph = graph_cases("empty")
 
     cell_id = "999"
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.setLabel", cell_id, "foo")
-
-    assert f"Unable to find cell with id {cell_id}" in selenium_extras.get_exception_message(e)
+    errors = graph.collect_js_errors([("api.setLabel", (cell_id, "foo"))])
+    assert errors == [f"Unable to find cell with id {cell_id}"]
 
 
 def test_set_double_click_handler(graph_cases) -> None:
@@ -1172,21 +1190,16 @@ def test_set_double_click_handler(graph_cases) -> None:
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
     """
     graph = graph_cases("1v")
-    vertex_id = graph.get_id(graph.get_vertex())
+    vertex_id = graph.vertex_id
 
-    graph.selenium.execute_script(
-        "callback = function(cellId) {"
-        "    if (!window.__dblClick__) {"
-        "        window.__dblClick__ = [];"
-        "    }"
-        "    window.__dblClick__.push(cellId);"
-        "}"
+    graph.eval_js_function(
+        "api.registerDoubleClickHandler", qmxgraph.js.Variable("__sinks__.dblClick")
     )
-    graph.eval_js_function("api.registerDoubleClickHandler", qmxgraph.js.Variable("callback"))
 
-    actions = ActionChains(graph.selenium)
-    actions.double_click(graph.get_vertex())
-    actions.perform()
+    graph.selenium.execute_script(
+        "arguments[0].dispatchEvent(new MouseEvent('dblclick', {bubbles: true}));",
+        graph.get_vertex(),
+    )
 
     assert graph.selenium.execute_script("return window.__dblClick__") == [vertex_id]
 
@@ -1200,15 +1213,9 @@ def test_add_selection_change_handler(graph_cases) -> None:
     source, target = graph.get_vertices()
     edge = graph.get_edge(source, target)
 
-    graph.selenium.execute_script(
-        "callback = function(cellIds) {"
-        "    if (!window.__selectionChange__) {"
-        "        window.__selectionChange__ = [];"
-        "    }"
-        "    window.__selectionChange__.push(cellIds);"
-        "}"
+    graph.eval_js_function(
+        "api.registerSelectionChangedHandler", qmxgraph.js.Variable("__sinks__.selectionChange")
     )
-    graph.eval_js_function("api.registerSelectionChangedHandler", qmxgraph.js.Variable("callback"))
 
     # Select all cells.
     actions = ActionChains(graph.selenium)
@@ -1219,26 +1226,28 @@ def test_add_selection_change_handler(graph_cases) -> None:
     actions.key_up(Keys.CONTROL)
     actions.perform()
 
+    source_id, target_id, edge_id = graph.vertex1_id, graph.vertex2_id, graph.edge_id
     fired_selection_events = graph.selenium.execute_script("return window.__selectionChange__")
     assert fired_selection_events == [
-        ["2"],
-        ["3", "2"],
-        ["4", "3", "2"],
+        [source_id],
+        [target_id, source_id],
+        [edge_id, target_id, source_id],
     ]
 
-    assert graph.eval_js_function("api.getSelectedCells") == ["4", "3", "2"]
+    assert graph.eval_js_function("api.getSelectedCells") == [edge_id, target_id, source_id]
 
-    # Programmatically select one cell.
-    graph.eval_js_function("api.setSelectedCells", ["3"])
-    # Clear selection.
-    graph.eval_js_function("api.setSelectedCells", [])
-
-    fired_selection_events = graph.selenium.execute_script("return window.__selectionChange__")
+    # Programmatically select one cell and then clear selection, all in a
+    # single script.
+    select_one = js.prepare_js_call("api.setSelectedCells", [target_id])
+    clear = js.prepare_js_call("api.setSelectedCells", [])
+    fired_selection_events = graph.selenium.execute_script(
+        f"{select_one}; {clear}; return window.__selectionChange__;"
+    )
     assert fired_selection_events == [
-        ["2"],
-        ["3", "2"],
-        ["4", "3", "2"],
-        ["3"],
+        [source_id],
+        [target_id, source_id],
+        [edge_id, target_id, source_id],
+        [target_id],
         [],
     ]
 
@@ -1249,25 +1258,21 @@ def test_set_popup_menu_handler(graph_cases) -> None:
     """
     graph = graph_cases("1v")
 
-    vertex_id = graph.get_id(graph.get_vertex())
+    vertex_id = graph.vertex_id
 
-    graph.selenium.execute_script(
-        "callback = function(cellId, x, y) {"
-        "    if (!window.__popupMenu__) {"
-        "        window.__popupMenu__ = [];"
-        "    }"
-        "    window.__popupMenu__.push([cellId, x, y]);"
-        "}"
+    graph.eval_js_function(
+        "api.registerPopupMenuHandler", qmxgraph.js.Variable("__sinks__.popupMenu")
     )
-    graph.eval_js_function("api.registerPopupMenuHandler", qmxgraph.js.Variable("callback"))
 
     vertex_label_el = graph.get_label_element(graph.get_vertex())
     actions = ActionChains(graph.selenium)
     actions.context_click(vertex_label_el)
     actions.perform()
 
-    x = vertex_label_el.location["x"] + vertex_label_el.size["width"] // 2
-    y = vertex_label_el.location["y"] + vertex_label_el.size["height"] // 2
+    # Position and size of label obtained at once, in a single round trip.
+    rect = vertex_label_el.rect
+    x = round(rect["x"]) + int(rect["width"]) // 2
+    y = round(rect["y"]) + int(rect["height"]) // 2
     assert graph.selenium.execute_script("return window.__popupMenu__") == [[vertex_id, x, y]]
 
 
@@ -1419,9 +1424,10 @@ def test_set_edge_terminals(graph_cases, terminal_type) -> None:
         assert 0
 
 
-def test_set_get_style(graph_cases) -> None:
+def test_set_get_style(graph_cases, selenium_extras) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
+    :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
     graph = graph_cases("1v")
     vertices = graph.get_vertices()
@@ -1437,7 +1443,8 @@ def test_set_get_style(graph_cases) -> None:
 
     with pytest.raises(WebDriverException) as excinfo:
         graph.eval_js_function("api.getStyle", "nonexistent")
-    assert "Unable to find cell with id nonexistent" in str(excinfo.value)
+    message = selenium_extras.get_exception_message(excinfo)
+    assert message == "Unable to find cell with id nonexistent"
 
 
 def test_set_get_connectable(graph_cases) -> None:
@@ -1461,110 +1468,147 @@ def test_set_get_connectable(graph_cases) -> None:
     assert connectable
 
 
-def test_get_edge_terminals_error_edge_not_found(graph_cases, selenium_extras) -> None:
+def test_get_edge_terminals_error_edge_not_found(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
     graph = graph_cases("empty")
 
     edge_id = "999"
 
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.getEdgeTerminals", edge_id)
-
-    assert f"Unable to find edge with id {edge_id}" in selenium_extras.get_exception_message(e)
+    errors = graph.collect_js_errors([("api.getEdgeTerminals", (edge_id,))])
+    assert errors == [f"Unable to find edge with id {edge_id}"]
 
 
-def test_get_edge_terminals_error_not_an_edge(graph_cases, selenium_extras) -> None:
+def test_get_edge_terminals_error_not_an_edge(graph_cases) -> None:
     """
     :type graph_cases: qmxgraph.tests.conftest.GraphCaseFactory
-    :type selenium_extras: qmxgraph.tests.conftest.SeleniumExtras
     """
     graph = graph_cases("1v")
-    vertex = graph.get_vertices()[0]
 
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.getEdgeTerminals", graph.get_id(vertex))
-
-    assert (
-        f"Cell with id {graph.get_id(vertex)} is not an edge"
-        in selenium_extras.get_exception_message(e)
-    )
+    errors = graph.collect_js_errors([("api.getEdgeTerminals", (graph.vertex_id,))])
+    assert errors == [f"Cell with id {graph.vertex_id} is not an edge"]
 
 
-def test_custom_font_family(graph_cases_factory, port) -> None:
+def test_custom_font_family(graph_cases_factory, host_pool) -> None:
     """
     :type graph_cases_factory: callable
-    :type port: qmxgraph.tests.conftest.Port
+    :type host_pool: callable
     """
     options = GraphOptions(
         font_family=("Helvetica",),
     )
 
-    with server.host(port=port.get(), options=options) as host:
-        cases = graph_cases_factory(host)
-        graph = cases("1v")
+    graph = graph_cases_factory(host_pool(options))("1v")
 
-        match = graph.selenium.find_elements(
-            By.CSS_SELECTOR, 'div[style*="font-family:"][style*="Helvetica"]'
-        )
-        assert len(match) == 1
+    assert graph.count_elements(HELVETICA_LABEL) == 1
 
 
 def test_ports(graph_cases) -> None:
     graph = graph_cases("2v")
-    vertex_a, vertex_b = graph.get_vertices()
     port_x_name, port_y_name = "X", "Y"
-    vertex_a_id = graph.get_id(vertex_a)
-    vertex_b_id = graph.get_id(vertex_b)
+    vertex_a_id = graph.vertex1_id
+    vertex_b_id = graph.vertex2_id
+    edge_id = js.Variable("edgeId")
+
+    # The whole scenario runs in a single script, each step recording either
+    # its returned value or the error it raised.
+    steps = [
+        # Test insert port.
+        js.prepare_js_call("api.insertPort", vertex_a_id, port_x_name, 0, 0, 9, 9),
+        js.prepare_js_call("api.insertPort", vertex_a_id, port_x_name, 1, 1, 9, 9),
+        # Test remove port.
+        js.prepare_js_call("api.removePort", vertex_a_id, port_x_name),
+        js.prepare_js_call("api.removePort", vertex_a_id, port_x_name),
+        # Test insert edge.
+        js.prepare_js_call("api.insertPort", vertex_a_id, port_x_name, 0, 0, 9, 9),
+        js.prepare_js_call("api.insertPort", vertex_b_id, port_y_name, 0, 0, 9, 9),
+        "edgeId = "
+        + js.prepare_js_call(
+            "api.insertEdge", vertex_a_id, vertex_b_id, None, None, None, port_x_name, port_y_name
+        ),
+        # When removing a port remove edges connected through it.
+        js.prepare_js_call("api.hasCell", edge_id),
+        js.prepare_js_call("api.getEdgeTerminals", edge_id),
+        js.prepare_js_call("api.getEdgeTerminalsWithPorts", edge_id),
+        js.prepare_js_call("api.removePort", vertex_b_id, port_y_name),
+        js.prepare_js_call("api.hasCell", edge_id),
+    ]
+    script = _PORT_STEPS_SCRIPT.format(
+        ", ".join(f"function () {{ return {step}; }}" for step in steps)
+    )
+    results = graph.selenium.execute_script(script)
+    graph.invalidate()
+
+    inserted_edge_id = results[6].get("value")
+    assert results == [
+        {"value": None},
+        {"error": f"The cell {vertex_a_id} already have a port named {port_x_name}"},
+        {"value": None},
+        {"error": f"The cell {vertex_a_id} does not have a port named {port_x_name}"},
+        {"value": None},
+        {"value": None},
+        {"value": inserted_edge_id},
+        {"value": True},
+        {"value": [vertex_a_id, vertex_b_id]},
+        {"value": [[vertex_a_id, port_x_name], [vertex_b_id, port_y_name]]},
+        {"value": None},
+        {"value": False},
+    ]
+    assert inserted_edge_id is not None
 
-    # Test insert port.
-    graph.eval_js_function("api.insertPort", vertex_a_id, port_x_name, 0, 0, 9, 9)
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.insertPort", vertex_a_id, port_x_name, 1, 1, 9, 9)
-    expected = "The cell {} already have a port named {}".format(vertex_a_id, port_x_name)
-    assert expected in str(e.value)
 
-    # Test remove port.
-    graph.eval_js_function("api.removePort", vertex_a_id, port_x_name)
-    with pytest.raises(WebDriverException) as e:
-        graph.eval_js_function("api.removePort", vertex_a_id, port_x_name)
-    expected = "The cell {} does not have a port named {}".format(vertex_a_id, port_x_name)
-    assert expected in str(e.value)
-
-    # Test insert edge.
-    graph.eval_js_function("api.insertPort", vertex_a_id, port_x_name, 0, 0, 9, 9)
-    graph.eval_js_function("api.insertPort", vertex_b_id, port_y_name, 0, 0, 9, 9)
-    edge_id = graph.eval_js_function(
-        "api.insertEdge", vertex_a_id, vertex_b_id, None, None, None, port_x_name, port_y_name
-    )
+# Runs each step of `test_ports` in a single evaluation, collecting either the
+# value returned or the message of the error raised by it.
+_PORT_STEPS_SCRIPT = textwrap.dedent(
+    """
+    var edgeId;
+    var steps = [{}];
+    return steps.map(function (step) {{
+        try {{
+            var value = step();
+            return {{value: value === undefined ? null : value}};
+        }} catch (e) {{
+            return {{error: e.message}};
+        }}
+    }});
+    """
+)
 
-    # When removing a port remove edges connected through it.
-    assert graph.eval_js_function("api.hasCell", edge_id)
-    assert [vertex_a_id, vertex_b_id] == graph.eval_js_function("api.getEdgeTerminals", edge_id)
-    assert [[vertex_a_id, port_x_name], [vertex_b_id, port_y_name]] == graph.eval_js_function(
-        "api.getEdgeTerminalsWithPorts", edge_id
-    )
-    graph.eval_js_function("api.removePort", vertex_b_id, port_y_name)
-    assert not graph.eval_js_function("api.hasCell", edge_id)
 
+def _insert_edge(graph, tags):
+    return graph.insert_edge(graph.vertex1_id, graph.vertex2_id, tags=tags)
 
-def insert_by_parametrized_type(graph, cell_type, tags=None):
-    if cell_type == qmxgraph.constants.CELL_TYPE_VERTEX:
-        cell_id = graph.insert_vertex(tags=tags)
-    elif cell_type == qmxgraph.constants.CELL_TYPE_TABLE:
-        cell_id = graph.insert_table(tags=tags)
-    elif cell_type in (qmxgraph.constants.CELL_TYPE_EDGE, qmxgraph.constants.CELL_TYPE_DECORATION):
-        graph.insert_vertex(x=10, y=10)
-        graph.insert_vertex(x=90, y=10)
-        cell_id = graph.insert_edge(*graph.get_vertices(), tags=tags)
-        if cell_type == qmxgraph.constants.CELL_TYPE_DECORATION:
-            cell_id = graph.insert_decoration(x=50, y=25, tags=tags)
-    else:
-        assert False, "Unexpected cell type: {}".format(cell_type)
 
-    return cell_id
+def _insert_decoration(graph, tags):
+    # Decorations can only be inserted over an edge.
+    _insert_edge(graph, tags)
+    return graph.insert_decoration(x=50, y=25, tags=tags)
+
+
+# Functions inserting a cell of each type, receiving graph and tags of cell.
+_CELL_INSERTERS = {
+    qmxgraph.constants.CELL_TYPE_VERTEX: lambda graph, tags: graph.insert_vertex(tags=tags),
+    qmxgraph.constants.CELL_TYPE_TABLE: lambda graph, tags: graph.insert_table(tags=tags),
+    qmxgraph.constants.CELL_TYPE_EDGE: _insert_edge,
+    qmxgraph.constants.CELL_TYPE_DECORATION: _insert_decoration,
+}
+
+
+def insert_by_parametrized_type(graph, cell_type, tags=None):
+    """
+    :param qmxgraph.tests.conftest.Graph2Vertices graph: Edges (and edges
+        under decorations) are inserted between vertices of this case.
+    :param str cell_type: Type of cell inserted.
+    :param dict|None tags: Tags of inserted cell.
+    :rtype: str
+    :return: Id of inserted cell.
+    """
+    try:
+        insert = _CELL_INSERTERS[cell_type]
+    except KeyError:
+        raise ValueError(f"Unexpected cell type: {cell_type}") from None
+    return insert(graph, tags)
 
 
 @pytest.mark.parametrize(
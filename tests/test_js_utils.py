@@ -1,45 +1,91 @@
+import json
+import os
+import shutil
+import subprocess
+from importlib.util import find_spec
+from typing import Any
+from typing import List
+from typing import Sequence
+
 import pytest
-from conftest import BaseGraphCase
-from conftest import GraphCaseFactory
 
+# Loads page sources into a sandbox and evaluates calls read from stdin, so
+# functions that don't depend on browser can be tested without one.
+_NODE_SCRIPT = """
+const fs = require("fs");
+const vm = require("vm");
+const context = vm.createContext({});
+context.window = context;
+for (const path of process.argv.slice(1)) {
+    vm.runInContext(fs.readFileSync(path, "utf8"), context, {filename: path});
+}
+const [fn, argsList] = JSON.parse(fs.readFileSync(0, "utf8"));
+const func = vm.runInContext(fn, context);
+process.stdout.write(JSON.stringify(argsList.map((args) => func.apply(null, args))));
+"""
 
-@pytest.fixture
-def graph(graph_cases: GraphCaseFactory) -> BaseGraphCase:
-    return graph_cases("empty")
 
+class NodeJsRuntime:
+    """
+    Evaluates functions of qmxgraph page sources using Node.js.
+    """
 
-def test_set_style_key(graph: BaseGraphCase) -> None:
-    assert graph.eval_js_function("graphs.utils.setStyleKey", "", "bar", 5) == "bar=5"
-    assert graph.eval_js_function("graphs.utils.setStyleKey", "style", "bar", 5) == "style;bar=5"
-    assert (
-        graph.eval_js_function("graphs.utils.setStyleKey", "style;bar=7", "bar", 5) == "style;bar=5"
-    )
-    assert (
-        graph.eval_js_function("graphs.utils.setStyleKey", "foobar=3;bar=7", "bar", 5)
-        == "foobar=3;bar=5"
-    )
-    assert (
-        graph.eval_js_function("graphs.utils.setStyleKey", "foobar=3", "bar", 5) == "foobar=3;bar=5"
-    )
-    assert (
-        graph.eval_js_function("graphs.utils.setStyleKey", "foobar=3;fizzbar=7", "bar", 5)
-        == "foobar=3;fizzbar=7;bar=5"
-    )
+    def __init__(self, node: str, sources: Sequence[str]) -> None:
+        self._node = node
+        self._sources = list(sources)
 
+    def call_batch(self, fn: str, args_list: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        :param fn: Name of JS function, e.g. `graphs.utils.setStyleKey`.
+        :param args_list: Arguments of each call of function.
+        :return: Results of each call, in same order as arguments.
+        """
+        output = subprocess.run(
+            [self._node, "-e", _NODE_SCRIPT, *self._sources],
+            input=json.dumps([fn, [list(args) for args in args_list]]),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output)
 
-def test_remove_style_key(graph: BaseGraphCase) -> None:
-    assert graph.eval_js_function("graphs.utils.removeStyleKey", "", "bar") == ""
-    assert graph.eval_js_function("graphs.utils.removeStyleKey", "style;bar=7", "bar") == "style"
-    assert (
-        graph.eval_js_function("graphs.utils.removeStyleKey", "style;bar=7", "foo") == "style;bar=7"
-    )
-    assert (
-        graph.eval_js_function("graphs.utils.removeStyleKey", "style;bar=7", "style")
-        == "style;bar=7"
-    )
-    assert (
-        graph.eval_js_function("graphs.utils.removeStyleKey", "foo=3;bar=7", "style")
-        == "foo=3;bar=7"
+
+@pytest.fixture(scope="session")
+def js_runtime() -> NodeJsRuntime:
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("Node.js is required to run page functions outside browser")
+    # Package is located without being imported, as importing it also loads
+    # Qt web engine, which isn't needed to run page functions.
+    (package_dir,) = find_spec("qmxgraph").submodule_search_locations
+    page_dir = os.path.join(package_dir, "page")
+    return NodeJsRuntime(
+        node, [os.path.join(page_dir, name) for name in ("namespace.js", "utils.js")]
     )
-    assert graph.eval_js_function("graphs.utils.removeStyleKey", "foo=3;bar=7", "foo") == "bar=7"
-    assert graph.eval_js_function("graphs.utils.removeStyleKey", "foo=3;bar=7", "bar") == "foo=3"
+
+
+def test_set_style_key(js_runtime: NodeJsRuntime) -> None:
+    calls = [
+        (("", "bar", 5), "bar=5"),
+        (("style", "bar", 5), "style;bar=5"),
+        (("style;bar=7", "bar", 5), "style;bar=5"),
+        (("foobar=3;bar=7", "bar", 5), "foobar=3;bar=5"),
+        (("foobar=3", "bar", 5), "foobar=3;bar=5"),
+        (("foobar=3;fizzbar=7", "bar", 5), "foobar=3;fizzbar=7;bar=5"),
+    ]
+    obtained = js_runtime.call_batch("graphs.utils.setStyleKey", [args for args, _ in calls])
+    assert obtained == [expected for _, expected in calls]
+
+
+def test_remove_style_key(js_runtime: NodeJsRuntime) -> None:
+    calls = [
+        (("", "bar"), ""),
+        (("style;bar=7", "bar"), "style"),
+        (("style;bar=7", "foo"), "style;bar=7"),
+        (("style;bar=7", "style"), "style;bar=7"),
+        (("foo=3;bar=7", "style"), "foo=3;bar=7"),
+        (("foo=3;bar=7", "foo"), "bar=7"),
+        (("foo=3;bar=7", "bar"), "foo=3"),
+    ]
+    obtained = js_runtime.call_batch("graphs.utils.removeStyleKey", [args for args, _ in calls])
+    assert obtained == [expected for _, expected in calls]
@@ -1,31 +1,36 @@
 import json
 import re
-import textwrap
+import sys
 from contextlib import nullcontext
-from functools import partial
 
 import pytest
+from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtCore import QByteArray
-from PyQt5.QtCore import QDataStream
-from PyQt5.QtCore import QIODevice
 from PyQt5.QtCore import QMimeData
 from PyQt5.QtCore import QPoint
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QDragEnterEvent
 from PyQt5.QtGui import QDragMoveEvent
 from PyQt5.QtGui import QDropEvent
+from PyQt5.QtWidgets import QDialog
 from pytest_mock import MockFixture
-from pytestqt.exceptions import TimeoutError as pytestqt_TimeoutError
+from pytestqt.exceptions import capture_exceptions
 
 import qmxgraph.constants
+import qmxgraph.debug
 import qmxgraph.js
 import qmxgraph.mime
 from qmxgraph._web_view import ViewState
+from qmxgraph.api import QmxGraphApi
 from qmxgraph.cell_bounds import CellBounds
+from qmxgraph.common_testing import get_cell_count
+from qmxgraph.common_testing import get_cell_ids
 from qmxgraph.exceptions import InvalidJavaScriptError
 from qmxgraph.exceptions import ViewStateError
 from qmxgraph.waiting import wait_callback_called
 from qmxgraph.waiting import wait_signals_called
+from qmxgraph.waiting import wait_until
+from qmxgraph.widget import EventsBridge
 from qmxgraph.widget import QmxGraph
 
 
@@ -42,110 +47,102 @@ def test_error_redirection(loaded_graph) -> None:
 
     assert cb.args is not None
     msg, url, line, column = cb.args
-    expected = textwrap.dedent(
-        """\
-        Uncaught Error: test
-        stack:
-        Error: test
-            at <anonymous>:1:7"""
-    )
     assert (url, line, column) == ("qrc:/", 1, 1)
 
 
-def test_events_bridge_delayed_signals(graph, qtbot, mocker) -> None:
-    from qmxgraph.widget import EventsBridge
-
+def test_events_bridge_delayed_signals(qtbot, mocker) -> None:
     events = EventsBridge()
 
     stub = mocker.stub()
     call = mocker.call
     events.on_cells_added.connect(stub)
 
-    events.cells_added_slot(["1"])
-    assert stub.call_args_list == []
-
-    def check_call(expected):
-        assert stub.call_args_list == expected
-
-    qtbot.waitUntil(partial(check_call, [call(["1"])]))
+    with qtbot.waitSignal(events.on_cells_added):
+        events.cells_added_slot(["1"])
+        assert stub.call_args_list == []
+    assert stub.call_args_list == [call(["1"])]
 
     with events.delaying_signals():
-        events.cells_added_slot(["2"])
-
-        expected = [call(["1"]), call(["2"])]
-        with pytest.raises((AssertionError, pytestqt_TimeoutError)):
-            qtbot.waitUntil(partial(check_call, expected), timeout=1000)
+        with qtbot.assertNotEmitted(events.on_cells_added, wait=200):
+            events.cells_added_slot(["2"])
+        assert stub.call_args_list == [call(["1"])]
 
-    qtbot.waitUntil(partial(check_call, expected))
+    # Delayed signals are emitted as soon as delaying stops.
+    assert stub.call_args_list == [call(["1"]), call(["2"])]
 
 
-def test_events_bridge_plain(graph, mocker) -> None:
+def test_events_bridge_plain(loaded_graph, mocker) -> None:
     """
     Verify if the Python code can listen to JavaScript events by using
     qmxgraph's events bridge.
 
-    :type graph: qmxgraph.widget.qmxgraph
+    :type loaded_graph: qmxgraph.widget.qmxgraph
     :type mocker: pytest_mock.MockFixture
     """
-    from qmxgraph.api import QmxGraphApi
-
+    graph = loaded_graph
     events = graph.events_bridge
 
-    added_handler = mocker.Mock()
-    removed_handler = mocker.Mock()
-    labels_handler = mocker.Mock()
-    selections_handler = mocker.Mock()
-    terminal_handler = mocker.Mock()
-    terminal_with_port_handler = mocker.Mock()
-
-    events.on_cells_added.connect(added_handler)
-    events.on_cells_removed.connect(removed_handler)
-    events.on_label_changed.connect(labels_handler)
-    events.on_selection_changed.connect(selections_handler)
-    events.on_terminal_changed.connect(terminal_handler)
-    events.on_terminal_with_port_changed.connect(terminal_with_port_handler)
+    handlers = spy_bridge(events, mocker)
 
-    graph.load_and_wait()
+    # Events are sent in order by JavaScript, so operations are done before
+    # waiting once for the last events expected. The only exception is the
+    # insertion of first vertex, so it is checked no selection event is sent
+    # before vertices are selected.
+    api = graph.api
     # on_cells_added
     with wait_signals_called(events.on_cells_added):
-        vertex_id = graph.api.insert_vertex(40, 40, 20, 20, "test")
-    assert added_handler.call_args_list == [mocker.call([vertex_id])]
+        vertex_id = api.insert_vertex(40, 40, 20, 20, "test")
     # on_selection_changed
-    assert selections_handler.call_args_list == []
-    with wait_signals_called(events.on_selection_changed):
-        eval_js(graph, "graphEditor.execute('selectVertices')")
-    assert selections_handler.call_args_list == [mocker.call([vertex_id])]
+    assert handlers["on_selection_changed"].call_args_list == []
+    eval_js(graph, "graphEditor.execute('selectVertices')")
     # on_label_changed
-    with wait_signals_called(events.on_label_changed):
-        graph.api.set_label(vertex_id, "TOTALLY NEW LABEL")
-    assert labels_handler.call_args_list == [mocker.call(vertex_id, "TOTALLY NEW LABEL", "test")]
+    api.set_label(vertex_id, "TOTALLY NEW LABEL")
     # on_terminal_changed, on_terminal_with_port_changed
-    foo_id = graph.api.insert_vertex(440, 40, 20, 20, "foo")
-    bar_id = graph.api.insert_vertex(40, 140, 20, 20, "bar")
-    edge_id = graph.api.insert_edge(vertex_id, foo_id, "edge")
     bar_port_name = "a-port"
-    assert not graph.api.has_port(bar_id, bar_port_name)
-    graph.api.insert_port(bar_id, bar_port_name, 0, 0, 5, 5)
-    assert graph.api.has_port(bar_id, bar_port_name)
-
-    with wait_signals_called(
-        events.on_terminal_changed,
-        events.on_terminal_with_port_changed,
-    ):
-        graph.api.set_edge_terminal(
-            edge_id, QmxGraphApi.TARGET_TERMINAL_CELL, bar_id, bar_port_name
-        )
-    with wait_signals_called(
-        events.on_terminal_changed,
-        events.on_terminal_with_port_changed,
-    ):
-        graph.api.set_edge_terminal(edge_id, QmxGraphApi.SOURCE_TERMINAL_CELL, foo_id)
+    foo_id, bar_id, edge_id, had_port, _, has_port = api.call_api_batch(
+        [
+            ("insertVertex", [440, 40, 20, 20, "foo"]),
+            ("insertVertex", [40, 140, 20, 20, "bar"]),
+            ("insertEdge", [vertex_id, api.batch_result(0), "edge"]),
+            ("hasPort", [api.batch_result(1), bar_port_name]),
+            ("insertPort", [api.batch_result(1), bar_port_name, 0, 0, 5, 5]),
+            ("hasPort", [api.batch_result(1), bar_port_name]),
+        ]
+    )
+    assert not had_port
+    assert has_port
+
+    api.call_api_batch(
+        [
+            (
+                "setEdgeTerminal",
+                [edge_id, QmxGraphApi.TARGET_TERMINAL_CELL, bar_id, bar_port_name],
+            ),
+            ("setEdgeTerminal", [edge_id, QmxGraphApi.SOURCE_TERMINAL_CELL, foo_id]),
+        ]
+    )
+    wait_until(
+        lambda: handlers["on_terminal_changed"].call_count
+        == handlers["on_terminal_with_port_changed"].call_count
+        == 2
+    )
 
-    assert terminal_handler.call_args_list == [
+    # Ports aren't reported as added cells.
+    assert handlers["on_cells_added"].call_args_list == [
+        mocker.call([vertex_id]),
+        mocker.call([foo_id]),
+        mocker.call([bar_id]),
+        mocker.call([edge_id]),
+    ]
+    assert handlers["on_selection_changed"].call_args_list == [mocker.call([vertex_id])]
+    assert handlers["on_label_changed"].call_args_list == [
+        mocker.call(vertex_id, "TOTALLY NEW LABEL", "test")
+    ]
+    assert handlers["on_terminal_changed"].call_args_list == [
         mocker.call(edge_id, QmxGraphApi.TARGET_TERMINAL_CELL, bar_id, foo_id),
         mocker.call(edge_id, QmxGraphApi.SOURCE_TERMINAL_CELL, foo_id, vertex_id),
     ]
-    assert terminal_with_port_handler.call_args_list == [
+    assert handlers["on_terminal_with_port_changed"].call_args_list == [
         mocker.call(
             edge_id,
             QmxGraphApi.TARGET_TERMINAL_CELL,
@@ -166,7 +163,7 @@ def test_events_bridge_plain(graph, mocker) -> None:
     # on_cells_removed
     with wait_signals_called(events.on_cells_removed):
         graph.api.remove_cells([vertex_id])
-    assert removed_handler.call_args_list == [mocker.call([vertex_id])]
+    assert handlers["on_cells_removed"].call_args_list == [mocker.call([vertex_id])]
 
 
 def test_bridges_signal_handlers_can_call_api(loaded_graph) -> None:
@@ -192,68 +189,43 @@ def test_bridges_signal_handlers_can_call_api(loaded_graph) -> None:
     assert zoom_scale_obtained == [1]
 
 
-def test_set_double_click_handler(graph, handler, qtbot) -> None:
+def test_set_double_click_and_popup_menu_handlers(graph, qtbot) -> None:
     """
-    :type graph: qmxgraph.widget.qmxgraph
-    :type handler: _HandlerFixture
-    """
-    js_script = "graphEditor.execute('doubleClick', {vertex})"
-
-    # Handler can be set even while not yet loaded
-    graph.double_click_bridge.on_double_click.connect(handler.handler_func)
-    handler.assert_handled(
-        js_script=js_script,
-        called=True,
-        expected_calls=[()],
-    )
-
-    # It should be restored if loaded again after being blanked
-    wait_until_blanked(qtbot, graph)
-    handler.assert_handled(
-        js_script=js_script,
-        called=True,
-        expected_calls=[()],
-    )
-
-    # Setting handler to None disconnects it from event
-    graph.double_click_bridge.on_double_click.disconnect(handler.handler_func)
-    handler.assert_handled(
-        js_script=js_script,
-        called=False,
-        expected_calls=[],
-    )
+    Both handlers are checked with the same graph through the same scenarios,
+    so the graph is loaded only twice for both of them.
 
-
-def test_set_popup_menu_handler(graph, handler, qtbot) -> None:
-    """
     :type graph: qmxgraph.widget.qmxgraph
-    :type handler: _HandlerFixture
     """
-    js_script = "graphEditor.execute('popupMenu', {vertex}, 15, 15)"
+    handlers = [
+        (
+            _HandlerFixture(graph, qtbot),
+            graph.double_click_bridge.on_double_click,
+            "graphEditor.execute('doubleClick', vertex)",
+            (),
+        ),
+        (
+            _HandlerFixture(graph, qtbot),
+            graph.popup_menu_bridge.on_popup_menu,
+            "graphEditor.execute('popupMenu', vertex, 15, 15)",
+            (15, 15),
+        ),
+    ]
 
     # Handler can be set even while not yet loaded
-    graph.popup_menu_bridge.on_popup_menu.connect(handler.handler_func)
-    handler.assert_handled(
-        js_script=js_script,
-        called=True,
-        expected_calls=[(15, 15)],
-    )
+    for handler, signal, js_script, args in handlers:
+        signal.connect(handler.handler_func)
+    for handler, signal, js_script, args in handlers:
+        handler.assert_handled(js_script=js_script, called=True, expected_calls=[args])
 
     # It should be restored if loaded again after being blanked
-    wait_until_blanked(qtbot, graph)
-    handler.assert_handled(
-        js_script=js_script,
-        called=True,
-        expected_calls=[(15, 15)],
-    )
+    graph.blank_and_wait()
+    for handler, signal, js_script, args in handlers:
+        handler.assert_handled(js_script=js_script, called=True, expected_calls=[args])
 
     # Setting handler to None disconnects it from event
-    graph.popup_menu_bridge.on_popup_menu.disconnect(handler.handler_func)
-    handler.assert_handled(
-        js_script=js_script,
-        called=False,
-        expected_calls=[],
-    )
+    for handler, signal, js_script, args in handlers:
+        signal.disconnect(handler.handler_func)
+        handler.assert_handled(js_script=js_script, called=False, expected_calls=[])
 
 
 def test_container_resize(loaded_graph) -> None:
@@ -263,13 +235,20 @@ def test_container_resize(loaded_graph) -> None:
 
     :type loaded_graph: qmxgraph.widget.qmxgraph
     """
-    expected_width = loaded_graph.inner_web_view().width()
-    expected_height = loaded_graph.inner_web_view().height()
+    web_view = loaded_graph.inner_web_view()
+    expected_width = web_view.width()
+    expected_height = web_view.height()
 
     def get_container_dimensions():
-        width = eval_js(loaded_graph, """document.getElementById('graphContainer').style.width""")
-        height = eval_js(loaded_graph, """document.getElementById('graphContainer').style.height""")
-        return int(width.replace("px", "")), int(height.replace("px", ""))
+        width, height = eval_js_batch(
+            loaded_graph,
+            [
+                "document.getElementById('graphContainer').style.width",
+                "document.getElementById('graphContainer').style.height",
+            ],
+        )
+        assert width.endswith("px") and height.endswith("px")
+        return int(width[: -len("px")]), int(height[: -len("px")])
 
     width, height = get_container_dimensions()
     assert width == expected_width
@@ -282,46 +261,48 @@ def test_container_resize(loaded_graph) -> None:
     assert height == expected_height
 
 
-def test_web_inspector(loaded_graph, mocker) -> None:
+def test_web_inspector(graph, mocker) -> None:
     """
-    :type loaded_graph: qmxgraph.widget.qmxgraph
+    :type graph: qmxgraph.widget.qmxgraph
     :type mocker: pytest_mock.MockFixture
     """
-    from PyQt5.QtWidgets import QDialog
-
     mocker.patch.object(QDialog, "show")
     mocker.patch.object(QDialog, "hide")
 
-    loaded_graph.show_inspector()
+    # Inspector stays bound to page of graph, so a graph not shared with
+    # other tests is used.
+    graph.load_and_wait()
+
+    graph.show_inspector()
     QDialog.show.assert_called_once_with()
 
-    loaded_graph.hide_inspector()
+    graph.hide_inspector()
     QDialog.hide.assert_called_once_with()
 
     QDialog.show.reset_mock()
-    loaded_graph.toggle_inspector()
+    graph.toggle_inspector()
     QDialog.show.assert_called_once_with()
 
 
-def test_blank(loaded_graph, qtbot) -> None:
+def test_blank(graph, qtbot) -> None:
     """
-    :type loaded_graph: qmxgraph.widget.QmxGraph
+    :type graph: qmxgraph.widget.QmxGraph
     """
-    assert loaded_graph.is_loaded()
+    graph.load_and_wait()
+    assert graph.is_loaded()
 
-    loaded_graph.blank()
+    graph.blank()
 
     def check():
-        assert loaded_graph.inner_web_view().view_state == ViewState.Blank
+        assert graph.inner_web_view().view_state == ViewState.Blank
 
     qtbot.waitUntil(check)
-    assert not loaded_graph.is_loaded()
+    assert not graph.is_loaded()
 
 
-def test_blank_and_load(graph, qtbot) -> None:
+def test_blank_and_load(graph) -> None:
     graph.load_and_wait()
-    graph.blank()
-    wait_until_blanked(qtbot, graph)
+    graph.blank_and_wait()
     graph.load_and_wait(timeout_ms=5000)
 
 
@@ -372,6 +353,29 @@ def test_state_errors_after_closing(graph: QmxGraph) -> None:
         graph.blank_and_wait()
 
 
+# Contents of drag&drop data are built once, while their MIME data must be
+# created in tests, as Qt objects require the application to be running.
+_DROPPED_VERTICES_DATA = {
+    "vertices": [
+        {
+            "dx": 0,
+            "dy": 0,
+            "width": 64,
+            "height": 64,
+            "label": "test 1",
+        },
+        {
+            "dx": 50,
+            "dy": 50,
+            "width": 32,
+            "height": 32,
+            "label": "test 2",
+            "tags": {"foo": "1", "bar": "a"},
+        },
+    ],
+}
+
+
 def test_drag_drop(loaded_graph, drag_drop_events) -> None:
     """
     Dragging and dropping data with valid qmxgraph MIME data in qmxgraph should
@@ -380,51 +384,45 @@ def test_drag_drop(loaded_graph, drag_drop_events) -> None:
     :type loaded_graph: qmxgraph.widget.qmxgraph
     :type drag_drop_events: DragDropEventsFactory
     """
-    mime_data = qmxgraph.mime.create_qt_mime_data(
-        {
-            "vertices": [
-                {
-                    "dx": 0,
-                    "dy": 0,
-                    "width": 64,
-                    "height": 64,
-                    "label": "test 1",
-                },
-                {
-                    "dx": 50,
-                    "dy": 50,
-                    "width": 32,
-                    "height": 32,
-                    "label": "test 2",
-                    "tags": {"foo": "1", "bar": "a"},
-                },
-            ],
-        }
-    )
+    mime_data = qmxgraph.mime.create_qt_mime_data(_DROPPED_VERTICES_DATA)
 
+    web_view = loaded_graph.inner_web_view()
     drag_enter_event = drag_drop_events.drag_enter(mime_data, position=(100, 100))
-    loaded_graph.inner_web_view().dragEnterEvent(drag_enter_event)
+    web_view.dragEnterEvent(drag_enter_event)
     assert drag_enter_event.acceptProposedAction.call_count == 1
 
     drag_move_event = drag_drop_events.drag_move(mime_data, position=(100, 100))
-    loaded_graph.inner_web_view().dragEnterEvent(drag_move_event)
+    web_view.dragMoveEvent(drag_move_event)
     assert drag_move_event.acceptProposedAction.call_count == 1
 
     drop_event = drag_drop_events.drop(mime_data, position=(100, 100))
-    loaded_graph.inner_web_view().dropEvent(drop_event)
+    web_view.dropEvent(drop_event)
     assert drop_event.acceptProposedAction.call_count == 1
 
-    cell_id = loaded_graph.api.get_cell_id_at(100, 100)
-    assert loaded_graph.api.get_cell_type(cell_id) == qmxgraph.constants.CELL_TYPE_VERTEX
-    assert loaded_graph.api.get_geometry(cell_id) == [100.0 - 64 / 2, 100.0 - 64 / 2, 64.0, 64.0]
-    assert loaded_graph.api.get_label(cell_id) == "test 1"
-
-    cell_id = loaded_graph.api.get_cell_id_at(150, 150)
-    assert loaded_graph.api.get_cell_type(cell_id) == qmxgraph.constants.CELL_TYPE_VERTEX
-    assert loaded_graph.api.get_geometry(cell_id) == [150.0 - 32 / 2, 150.0 - 32 / 2, 32.0, 32.0]
-    assert loaded_graph.api.get_label(cell_id) == "test 2"
-    assert loaded_graph.api.get_tag(cell_id, "foo") == "1"
-    assert loaded_graph.api.get_tag(cell_id, "bar") == "a"
+    # Cells are looked up in the same evaluation of JavaScript that queries them.
+    cell_1 = qmxgraph.js.Variable("api.getCellIdAt(100, 100)")
+    cell_2 = qmxgraph.js.Variable("api.getCellIdAt(150, 150)")
+    assert loaded_graph.api.call_api_batch(
+        [
+            ("getCellType", [cell_1]),
+            ("getGeometry", [cell_1]),
+            ("getLabel", [cell_1]),
+            ("getCellType", [cell_2]),
+            ("getGeometry", [cell_2]),
+            ("getLabel", [cell_2]),
+            ("getTag", [cell_2, "foo"]),
+            ("getTag", [cell_2, "bar"]),
+        ]
+    ) == [
+        qmxgraph.constants.CELL_TYPE_VERTEX,
+        [100.0 - 64 / 2, 100.0 - 64 / 2, 64.0, 64.0],
+        "test 1",
+        qmxgraph.constants.CELL_TYPE_VERTEX,
+        [150.0 - 32 / 2, 150.0 - 32 / 2, 32.0, 32.0],
+        "test 2",
+        "1",
+        "a",
+    ]
 
 
 def test_drag_drop_invalid_mime_type(loaded_graph, drag_drop_events) -> None:
@@ -435,52 +433,49 @@ def test_drag_drop_invalid_mime_type(loaded_graph, drag_drop_events) -> None:
     :type loaded_graph: qmxgraph.widget.qmxgraph
     :type drag_drop_events: DragDropEventsFactory
     """
-    item_data = QByteArray()
-    data_stream = QDataStream(item_data, QIODevice.WriteOnly)
-    data_stream.writeString(
-        json.dumps('<?xml version="1.0"?><message>Hello World!</message>').encode("utf8")
-    )
+    item_data = QByteArray(b'<?xml version="1.0"?><message>Hello World!</message>')
 
     mime_data = QMimeData()
     mime_data.setData("application/xml", item_data)
 
+    web_view = loaded_graph.inner_web_view()
     drag_enter_event = drag_drop_events.drag_enter(mime_data)
-    loaded_graph.inner_web_view().dragEnterEvent(drag_enter_event)
+    web_view.dragEnterEvent(drag_enter_event)
     assert drag_enter_event.ignore.call_count == 1
 
     drag_move_event = drag_drop_events.drag_move(mime_data)
-    loaded_graph.inner_web_view().dragMoveEvent(drag_move_event)
+    web_view.dragMoveEvent(drag_move_event)
     assert drag_move_event.ignore.call_count == 1
 
     drop_event = drag_drop_events.drop(mime_data)
-    loaded_graph.inner_web_view().dropEvent(drop_event)
+    web_view.dropEvent(drop_event)
     assert drop_event.ignore.call_count == 1
 
 
+_INVALID_VERSION_DATA = {
+    "version": -1,
+}
+
+
 @pytest.mark.qt_no_exception_capture
 def test_drag_drop_invalid_version(loaded_graph, drag_drop_events) -> None:
     """
     :type loaded_graph: qmxgraph.widget.qmxgraph
     :type drag_drop_events: DragDropEventsFactory
     """
-    mime_data = qmxgraph.mime.create_qt_mime_data(
-        {
-            "version": -1,
-        }
-    )
+    mime_data = qmxgraph.mime.create_qt_mime_data(_INVALID_VERSION_DATA)
 
+    web_view = loaded_graph.inner_web_view()
     drag_enter_event = drag_drop_events.drag_enter(mime_data)
-    loaded_graph.inner_web_view().dragEnterEvent(drag_enter_event)
+    web_view.dragEnterEvent(drag_enter_event)
     assert drag_enter_event.acceptProposedAction.call_count == 1
 
     drag_move_event = drag_drop_events.drag_move(mime_data)
-    loaded_graph.inner_web_view().dragMoveEvent(drag_move_event)
+    web_view.dragMoveEvent(drag_move_event)
     assert drag_move_event.acceptProposedAction.call_count == 1
 
     drop_event = drag_drop_events.drop(mime_data)
 
-    import sys
-
     print(
         (
             "This test will cause an exception in a Qt event loop:\n"
@@ -488,10 +483,9 @@ def test_drag_drop_invalid_version(loaded_graph, drag_drop_events) -> None:
         ),
         file=sys.stderr,
     )
-    from pytestqt.exceptions import capture_exceptions
 
     with capture_exceptions() as exceptions:
-        loaded_graph.inner_web_view().dropEvent(drop_event)
+        web_view.dropEvent(drop_event)
 
     assert drop_event.acceptProposedAction.call_count == 0
     assert len(exceptions) == 1
@@ -504,8 +498,6 @@ def test_invalid_api_call(loaded_graph, debug) -> None:
     :type loaded_graph: qmxgraph.widget.qmxgraph
     :type debug: bool
     """
-    import qmxgraph.debug
-
     old_debug = qmxgraph.debug.is_qmxgraph_debug_enabled()
     qmxgraph.debug.set_qmxgraph_debug(debug)
     try:
@@ -527,32 +519,33 @@ def test_invalid_api_call(loaded_graph, debug) -> None:
 
 
 @pytest.mark.parametrize("enabled", (True, False))
-def test_graph_api_calls(loaded_graph, enabled) -> None:
+@pytest.mark.parametrize(
+    ("python_getter", "getter", "setter"),
+    [
+        ("is_cells_deletable", "isCellsDeletable", "setCellsDeletable"),
+        ("is_cells_disconnectable", "isCellsDisconnectable", "setCellsDisconnectable"),
+        ("is_cells_editable", "isCellsEditable", "setCellsEditable"),
+        ("is_cells_movable", "isCellsMovable", "setCellsMovable"),
+        ("is_cells_connectable", "isCellsConnectable", "setCellsConnectable"),
+    ],
+)
+def test_graph_api_calls(loaded_graph, python_getter, getter, setter, enabled) -> None:
     """
     Tests the available calls to the graph api.
     """
-    graph_api_functions = [
-        ("is_cells_deletable", "set_cells_deletable"),
-        ("is_cells_disconnectable", "set_cells_disconnectable"),
-        ("is_cells_editable", "set_cells_editable"),
-        (
-            "is_cells_movable",
-            "set_cells_movable",
-        ),
-        (
-            "is_cells_connectable",
-            "set_cells_connectable",
-        ),
-    ]
+    api = loaded_graph.api
 
-    for getter_name, setter_name in graph_api_functions:
-        getter_func = getattr(loaded_graph.api, getter_name)
-        setter_func = getattr(loaded_graph.api, setter_name)
-
-        setter_func(enabled)
-        assert getter_func() is enabled
-        setter_func(not enabled)
-        assert getter_func() is not enabled
+    # Toggling option is done by a single evaluation of JavaScript.
+    initial, _, obtained_enabled, _, obtained_not_enabled = api.call_api_batch(
+        [(getter, []), (setter, [enabled]), (getter, []), (setter, [not enabled]), (getter, [])]
+    )
+    try:
+        assert obtained_enabled is enabled
+        assert obtained_not_enabled is not enabled
+        assert getattr(api, python_getter)() is not enabled
+    finally:
+        # Graph is shared with other tests.
+        api.call_api(setter, initial)
 
 
 def test_tags(loaded_graph) -> None:
@@ -561,25 +554,36 @@ def test_tags(loaded_graph) -> None:
     """
     no_tags_id = loaded_graph.api.insert_vertex(10, 10, 20, 20, "test")
 
-    assert not loaded_graph.api.has_tag(no_tags_id, "foo")
-    loaded_graph.api.set_tag(no_tags_id, "foo", "1")
-    assert loaded_graph.api.has_tag(no_tags_id, "foo")
-    assert loaded_graph.api.get_tag(no_tags_id, "foo") == "1"
+    had_tag, _, has_tag, tag = loaded_graph.api.call_api_batch(
+        [
+            ("hasTag", [no_tags_id, "foo"]),
+            ("setTag", [no_tags_id, "foo", "1"]),
+            ("hasTag", [no_tags_id, "foo"]),
+            ("getTag", [no_tags_id, "foo"]),
+        ]
+    )
+    assert not had_tag
+    assert has_tag
+    assert tag == "1"
 
     with_tags_id = loaded_graph.api.insert_vertex(50, 50, 20, 20, "test", tags={"bar": "2"})
-    assert loaded_graph.api.has_tag(with_tags_id, "bar")
-    assert loaded_graph.api.get_tag(with_tags_id, "bar") == "2"
+    assert loaded_graph.api.call_api_batch(
+        [("hasTag", [with_tags_id, "bar"]), ("getTag", [with_tags_id, "bar"])]
+    ) == [True, "2"]
 
 
 def test_get_cell_count(loaded_graph) -> None:
     """
     :type loaded_graph: qmxgraph.widget.qmxgraph
     """
-    from qmxgraph.common_testing import get_cell_count
-
-    node_a = loaded_graph.api.insert_vertex(10, 10, 50, 50, "A")
-    node_b = loaded_graph.api.insert_vertex(400, 300, 50, 50, "B")
-    loaded_graph.api.insert_edge(node_a, node_b, "AB")
+    api = loaded_graph.api
+    api.call_api_batch(
+        [
+            ("insertVertex", [10, 10, 50, 50, "A"]),
+            ("insertVertex", [400, 300, 50, 50, "B"]),
+            ("insertEdge", [api.batch_result(0), api.batch_result(1), "AB"]),
+        ]
+    )
 
     assert get_cell_count(loaded_graph, "function(cell){ return false }") == 0
     assert get_cell_count(loaded_graph, "function(cell){ return cell.isEdge() }") == 1
@@ -590,11 +594,14 @@ def test_get_cell_ids(loaded_graph) -> None:
     """
     :type loaded_graph: qmxgraph.widget.qmxgraph
     """
-    from qmxgraph.common_testing import get_cell_ids
-
-    node_a = loaded_graph.api.insert_vertex(10, 10, 50, 50, "A")
-    node_b = loaded_graph.api.insert_vertex(400, 300, 50, 50, "B")
-    loaded_graph.api.insert_edge(node_a, node_b, "AB")
+    api = loaded_graph.api
+    api.call_api_batch(
+        [
+            ("insertVertex", [10, 10, 50, 50, "A"]),
+            ("insertVertex", [400, 300, 50, 50, "B"]),
+            ("insertEdge", [api.batch_result(0), api.batch_result(1), "AB"]),
+        ]
+    )
 
     assert get_cell_ids(loaded_graph, "function(cell){ return false }") == []
     assert get_cell_ids(loaded_graph, "function(cell){ return cell.isEdge() }") == ["4"]
@@ -616,14 +623,18 @@ def test_last_index_of(loaded_graph) -> None:
     """
     :type loaded_graph: qmxgraph.widget.qmxgraph
     """
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('a')") == 3
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('a', 2)") == 1
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('a', 0)") == -1
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('x')") == -1
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('c', -5)") == 0
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('c', 0)") == 0
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('')") == 5
-    assert eval_js(loaded_graph, "'canal'.lastIndexOf('', 2)") == 2
+    calls = [
+        ("'canal'.lastIndexOf('a')", 3),
+        ("'canal'.lastIndexOf('a', 2)", 1),
+        ("'canal'.lastIndexOf('a', 0)", -1),
+        ("'canal'.lastIndexOf('x')", -1),
+        ("'canal'.lastIndexOf('c', -5)", 0),
+        ("'canal'.lastIndexOf('c', 0)", 0),
+        ("'canal'.lastIndexOf('')", 5),
+        ("'canal'.lastIndexOf('', 2)", 2),
+    ]
+    obtained = eval_js_batch(loaded_graph, [statement for statement, _ in calls])
+    assert obtained == [expected for _, expected in calls]
 
 
 @pytest.mark.parametrize(
@@ -649,9 +660,13 @@ def test_zoom(loaded_graph: QmxGraph, zoom_in: bool, zoom_to_cursor: bool) -> No
     zoom_event = {"clientX": node_center_x, "clientY": node_center_y}
     args = ", ".join(json.dumps(arg) for arg in [zoom_event, zoom_in, zoom_to_cursor])
 
-    eval_js(loaded_graph, f"graphs.handleMouseWheelEvent(graphEditor.graph, {args})")
-
-    new_x, new_y, new_width, new_height = loaded_graph.api.get_geometry(node)
+    _, (new_x, new_y, new_width, new_height) = eval_js_batch(
+        loaded_graph,
+        [
+            f"graphs.handleMouseWheelEvent(graphEditor.graph, {args})",
+            f"api.getGeometry({json.dumps(node)})",
+        ],
+    )
     assert (new_width > width) == (new_height > height) == zoom_in
 
     new_node_center_x = new_x + new_width / 2
@@ -664,6 +679,20 @@ def eval_js(graph_widget, statement):
     return graph_widget.inner_web_view().eval_js(statement)
 
 
+def eval_js_batch(graph_widget, statements):
+    """
+    Evaluates several statements with a single call to web view, as every
+    evaluation is a round trip to web engine.
+
+    :param qmxgraph.widget.QmxGraph graph_widget: Graph widget.
+    :param list[str] statements: JavaScript expressions.
+    :rtype: list
+    :return: Result of each expression, respectively.
+    """
+    result = eval_js(graph_widget, "JSON.stringify([{}])".format(", ".join(statements)))
+    return json.loads(result)
+
+
 @pytest.fixture(name="graph")
 def graph_(qtbot) -> QmxGraph:
     """
@@ -677,34 +706,48 @@ def graph_(qtbot) -> QmxGraph:
     return graph_
 
 
+@pytest.fixture(scope="module")
+def shared_graph(qapp) -> QmxGraph:
+    """
+    A graph loaded only once for all tests in module, as loading the page
+    carries the whole web engine bootstrap. Tests should use `loaded_graph`,
+    which resets its state, instead.
+
+    :type qapp: QApplication
+    :rtype: qmxgraph.widget.qmxgraph
+    """
+    graph_ = QmxGraph(auto_load=False)
+    graph_.load_and_wait()
+    yield graph_
+    graph_.close()
+
+
 @pytest.fixture(name="loaded_graph")
-def loaded_graph_(graph):
+def loaded_graph_(shared_graph):
     """
-    :type graph: qmxgraph.widget.qmxgraph
+    :type shared_graph: qmxgraph.widget.qmxgraph
     :rtype: qmxgraph.widget.qmxgraph
     """
-    graph.load_and_wait()
-    return graph
+    size = shared_graph.size()
+    yield shared_graph
+    shared_graph.resize(size)
+    reset_graph(shared_graph)
 
 
 @pytest.fixture(name="drag_drop_events")
-def drag_drop_events_(mocker):
+def drag_drop_events_():
     """
-    :type mocker: pyest_mock.MockFixture
     :rtype: DragDropEventsFactory
     """
-    return DragDropEventsFactory(mocker)
+    return DragDropEventsFactory()
 
 
 class DragDropEventsFactory(object):
     """
-    Creates Qt drag & drop events spying some essential methods so tests can
-    track how many calls are made to them.
+    Creates Qt drag & drop events counting calls to some essential methods so
+    tests can track how many calls are made to them.
     """
 
-    def __init__(self, mocker):
-        self.mocker = mocker
-
     def drag_enter(self, mime_data, position=None):
         return self._create_dd_event(QDragEnterEvent, mime_data=mime_data, position=position)
 
@@ -719,21 +762,79 @@ class DragDropEventsFactory(object):
         position = position or (100, 100)
         dd_args = QPoint(*position), Qt.MoveAction, mime_data, Qt.LeftButton, Qt.NoModifier
         dd_event = event_type(*dd_args)
-        self.mocker.spy(dd_event, "acceptProposedAction")
-        self.mocker.spy(dd_event, "ignore")
+        dd_event.acceptProposedAction = _CallCounter(dd_event.acceptProposedAction)
+        dd_event.ignore = _CallCounter(dd_event.ignore)
         return dd_event
 
 
-def wait_until_blanked(qtbot, graph):
+class _CallCounter:
+    """
+    Counts calls forwarded to a function, lighter than a spy from `mocker`
+    when only the number of calls matters.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.call_count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.call_count += 1
+        return self.func(*args, **kwargs)
+
+
+def reset_graph(graph):
     """
+    Removes all cells from graph, restores its zoom and selection and
+    disconnects everything connected to its bridges, so it can be reused by
+    another test without reloading page.
+
     :type graph: qmxgraph.widget.qmxgraph
     """
-    graph.blank()
+    # Evaluation waits on event loop, so signals already sent by JavaScript
+    # are emitted before being disconnected below.
+    eval_js(
+        graph,
+        "graphEditor.graph.clearSelection(); graphEditor.graph.model.clear(); api.resetZoom();",
+    )
+    bridges = (
+        graph.error_bridge,
+        graph.events_bridge,
+        graph.double_click_bridge,
+        graph.popup_menu_bridge,
+    )
+    for bridge in bridges:
+        for name in get_bridge_signal_names(bridge):
+            try:
+                getattr(bridge, name).disconnect()
+            except TypeError:
+                pass  # Nothing connected to signal.
 
-    def is_blank():
-        assert graph.inner_web_view().view_state == ViewState.Blank
 
-    qtbot.waitUntil(is_blank)
+def get_bridge_signal_names(bridge):
+    """
+    :type bridge: qmxgraph.widget.DelayedSignalsBridge
+    :rtype: list[str]
+    :return: Names of signals declared by bridge class.
+    """
+    return [
+        name for name, value in type(bridge).__dict__.items() if isinstance(value, pyqtSignal)
+    ]
+
+
+def spy_bridge(bridge, mocker):
+    """
+    Connects a mock to every signal of bridge.
+
+    :type bridge: qmxgraph.widget.DelayedSignalsBridge
+    :type mocker: pytest_mock.MockFixture
+    :rtype: dict[str, mock.Mock]
+    :return: Mocks connected to signals, by signal name.
+    """
+    handlers = {}
+    for name in get_bridge_signal_names(bridge):
+        handlers[name] = mocker.Mock()
+        getattr(bridge, name).connect(handlers[name])
+    return handlers
 
 
 class _HandlerFixture:
@@ -751,37 +852,31 @@ class _HandlerFixture:
     def assert_handled(self, *, js_script, called, expected_calls=()):
         pass
 
-        assert "{vertex}" in js_script
         self.graph.load_and_wait()
-        vertex_id = self.graph.api.insert_vertex(
-            10,
-            10,
-            20,
-            20,
-            "handler fixture test",
+        # Vertex is inserted by the same evaluation of JavaScript that
+        # triggers the handler, which returns the id of vertex. Script refers
+        # to it as `vertex`.
+        insert_vertex = qmxgraph.js.prepare_js_call(
+            "api.insertVertex", 10, 10, 20, 20, "handler fixture test"
         )
-        js_script = js_script.format(
-            vertex=f"graphEditor.graph.model.getCell({vertex_id})",
+        js_script = "(function () {{ var vertex = {}; {}; return vertex.getId(); }})()".format(
+            f"graphEditor.graph.model.getCell({insert_vertex})",
+            js_script,
         )
         if called:
             error_context = nullcontext()
+            timeout_ms = 1000
         else:
             error_context = pytest.raises(TimeoutError)
+            # Handler is called within a few milliseconds when connected, so
+            # there is no need to wait as long to be sure it wasn't called.
+            timeout_ms = 250
 
         with error_context:
-            with wait_callback_called() as cb:
+            with wait_callback_called(timeout_ms=timeout_ms) as cb:
                 self.cb = cb
 
-                eval_js(self.graph, js_script)
+                vertex_id = eval_js(self.graph, js_script)
 
-        assert self.calls == [tuple(vertex_id) + tuple(args) for args in expected_calls]
+        assert self.calls == [(vertex_id, *args) for args in expected_calls]
         self.calls.clear()
-
-
-@pytest.fixture(name="handler")
-def handler_(graph, qtbot):
-    """
-    :type graph: qmxgraph.widget.qmxgraph
-    :rtype: _HandlerFixture
-    """
-    return _HandlerFixture(graph, qtbot)
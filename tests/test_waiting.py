@@ -0,0 +1,54 @@
+import pytest
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QTimer
+
+from qmxgraph.waiting import wait_callback_called
+from qmxgraph.waiting import wait_signals_called
+
+
+class _Emitter(QObject):
+    value_emitted = pyqtSignal(int)
+
+    def emit_later(self, value: int, delay_ms: int) -> None:
+        QTimer.singleShot(delay_ms, lambda: self.value_emitted.emit(value))
+
+
+def test_wait_signals_called_timeout(qapp) -> None:
+    emitter = _Emitter()
+    with pytest.raises(TimeoutError, match="timed out in 50 milliseconds"):
+        with wait_signals_called(emitter.value_emitted, timeout_ms=50):
+            pass
+
+
+def test_wait_callback_called_timeout(qapp) -> None:
+    with pytest.raises(TimeoutError, match="timed out in 50 milliseconds"):
+        with wait_callback_called(timeout_ms=50):
+            pass
+
+
+def test_wait_signals_called_until_params_accepted(qapp) -> None:
+    """
+    Waiting goes on after a call with arguments rejected by `check_params_cb`,
+    until a call with accepted arguments.
+    """
+    emitter = _Emitter()
+    checked = []
+
+    def check_params(value: int) -> bool:
+        checked.append(value)
+        return value == 3
+
+    with wait_signals_called(emitter.value_emitted, check_params_cb=check_params) as callback:
+        for value in (1, 2, 3):
+            emitter.emit_later(value, delay_ms=10 * value)
+
+    assert callback.args == (3,)
+    assert checked[:3] == [1, 2, 3]
+
+
+def test_wait_callback_called(qapp) -> None:
+    with wait_callback_called() as callback:
+        QTimer.singleShot(10, lambda: callback("done"))
+
+    assert callback.args == ("done",)